@@ -1,7 +1,17 @@
 from enum import Enum
 import os
+import time
+from typing import Dict, List, Optional, Tuple
 import typer
-from valid_social_cli.utils.stealth_browser import launch_stealth_browser, close_playwright
+from playwright.sync_api import BrowserContext, Page, Playwright
+from valid_social_cli.utils.stealth_browser import (
+    launch_stealth_browser,
+    close_context,
+    close_playwright,
+    headless_enabled,
+)
+from valid_social_cli.utils.login_state import is_logged_in
+from valid_social_cli.utils.remote_view import RemoteView
 
 app = typer.Typer(help="🔐 Login to your social media accounts.")
 
@@ -12,107 +22,156 @@ class PlatformEnum(str, Enum):
     FACEBOOK = "facebook"
     LINKEDIN = "linkedin"
     TIKTOK = "facebook"
+    ALL = "all"
+
+
+# platform -> (display name, profile path, login url)
+LOGIN_TARGETS: Dict[PlatformEnum, Tuple[str, str, str]] = {
+    PlatformEnum.INSTAGRAM: (
+        "Instagram",
+        "storage/browser_profiles/instagram_profile",
+        "https://www.instagram.com/",
+    ),
+    PlatformEnum.X: (
+        "X",
+        "storage/browser_profiles/x_profile",
+        "https://x.com/home",
+    ),
+    PlatformEnum.FACEBOOK: (
+        "Facebook",
+        "storage/browser_profiles/facebook_profile",
+        "https://facebook.com",
+    ),
+}
+
+POLL_INTERVAL_MS = 1000
+# Headless logins pump the live view far more often than they check cookies.
+VIEW_PUMP_INTERVAL_MS = 100
+
+
+def resolve_platforms(platforms: List[PlatformEnum]) -> List[PlatformEnum]:
+    """Expand 'all', drop duplicates and unsupported platforms, keep order."""
+    if PlatformEnum.ALL in platforms:
+        return list(LOGIN_TARGETS)
+
+    resolved: List[PlatformEnum] = []
+    for platform in platforms:
+        if platform not in LOGIN_TARGETS:
+            print(f"❌ Unsupported platform: {platform.value}")
+        elif platform not in resolved:
+            resolved.append(platform)
+    return resolved
 
 
 @app.callback(invoke_without_command=True)
 def login(
-    platform: PlatformEnum = typer.Option(
+    platforms: List[PlatformEnum] = typer.Option(
         ...,
         "--platform",
         "-p",
-        help="Platform to log into. Options: instagram, x, facebook"
-    )
+        help="Platform(s) to log into. Options: instagram, x, facebook, all"
+    ),
+    timeout: int = typer.Option(
+        600, "--timeout", "-t", help="Seconds to wait for all logins to finish"
+    ),
+    headless: Optional[bool] = typer.Option(
+        None, "--headless/--headed",
+        help="Log in through a live view served on localhost (default, or set "
+             "VALID_SOCIAL_HEADLESS=0 for browser windows)"
+    ),
+    view_port: int = typer.Option(
+        0, "--view-port", help="Port for the headless live view (default: any free port)"
+    ),
 ):
     """
-     Opens a browser for the user to manually log into the specified platform.
-     The session is saved for future automated actions.
+     Opens one browser page per platform for the user to log in manually.
+     Headless pages are shown in a live view on localhost; with --headed
+     each opens in its own window instead.
+     Each session is saved and closed as soon as its login is detected.
      """
-    if platform == PlatformEnum.INSTAGRAM:
-        profile_path = "storage/browser_profiles/instagram_profile"
-        os.makedirs(profile_path, exist_ok=True)
-
-        print("🌐 Launching Instagram login browser...")
-        playwright, context = launch_stealth_browser(
-            user_data_dir=profile_path,
-            headless=False,
-            slow_mo=150,
-        )
-
-        try:
+    selected = resolve_platforms(platforms)
+    if not selected:
+        raise typer.Exit(code=1)
+
+    headless = headless_enabled(headless)
+
+    playwright: Optional[Playwright] = None
+    pending: Dict[PlatformEnum, Tuple[BrowserContext, Page]] = {}
+    view: Optional[RemoteView] = RemoteView(view_port) if headless else None
+
+    try:
+        for platform in selected:
+            name, profile_path, url = LOGIN_TARGETS[platform]
+            os.makedirs(profile_path, exist_ok=True)
+
+            print(f"🌐 Launching {name} login browser...")
+            playwright, context = launch_stealth_browser(
+                user_data_dir=profile_path,
+                headless=headless,
+                slow_mo=0,
+                playwright=playwright,
+            )
             page = context.new_page()
-            page.goto("https://www.instagram.com/",
-                      wait_until="domcontentloaded")
-
-            print("⚠️ Please log in manually in the opened browser window.")
-            print(
-                "Once logged in and your feed appears, close any popups, then return here.")
+            pending[platform] = (context, page)
+            page.goto(url, wait_until="domcontentloaded")
+            if view is not None:
+                view.add_page(name, page)
+
+        names = ", ".join(LOGIN_TARGETS[p][0] for p in pending)
+        if view is not None:
+            print(f"🖥️ Live view of the headless browser(s): {view.start()}")
+            print(f"⚠️ Open it in your browser and log in manually: {names}")
+            print("   On a remote machine, forward the port first: "
+                  f"ssh -L {view.port}:127.0.0.1:{view.port} <host>")
+        else:
+            print(f"⚠️ Please log in manually in the opened browser window(s): {names}")
+        print("⏸️ Each window closes by itself once its login is detected...")
+
+        deadline = time.monotonic() + timeout
+        next_check = 0.0
+        while pending and time.monotonic() < deadline:
+            if time.monotonic() >= next_check:
+                next_check = time.monotonic() + POLL_INTERVAL_MS / 1000
+                for platform, (context, page) in list(pending.items()):
+                    name = LOGIN_TARGETS[platform][0]
+
+                    if page.is_closed():
+                        print(f"❌ {name} window was closed before login finished.")
+                    elif is_logged_in(context, platform.value, page):
+                        print(
+                            f"✅ {name} session saved successfully. You won’t need to log in again.")
+                    else:
+                        continue
+                    if view is not None:
+                        view.remove_page(name)
+                    close_context(context, False)
+                    del pending[platform]
+
+            if pending:
+                # Waiting on a live page keeps Playwright's event loop pumping.
+                _context, page = next(iter(pending.values()))
+                try:
+                    if view is not None:
+                        view.pump()
+                        page.wait_for_timeout(VIEW_PUMP_INTERVAL_MS)
+                    else:
+                        page.wait_for_timeout(POLL_INTERVAL_MS)
+                except Exception:
+                    pass  # Page closed mid-wait; handled on the next pass
+
+        for platform in pending:
             print(
-                "⏸️ Waiting for you to finish login (press Resume in Playwright Inspector if needed)...")
-            page.pause()
-
-            print(
-                "✅ Instagram session saved successfully. You won’t need to log in again.")
-        finally:
-            close_playwright(playwright, context)
-
-    elif platform == PlatformEnum.X:
-        profile_path = "storage/browser_profiles/x_profile"
-        os.makedirs(profile_path, exist_ok=True)
-
-        print("🌐 Launching X login browser...")
-        playwright, context = launch_stealth_browser(
-            user_data_dir=profile_path,
-            headless=False,
-            slow_mo=150,
-        )
-
-        try:
-            page = context.new_page()
-            page.goto("https://x.com/home",
-                      wait_until="domcontentloaded")
-
-            print("⚠️ Please log in manually in the opened browser window.")
-            print(
-                "Once logged in and your feed appears, close any popups, then return here.")
-            print(
-                "⏸️ Waiting for you to finish login (press Resume in Playwright Inspector if needed)...")
-            page.pause()
-
-            print(
-                "✅ X session saved successfully. You won’t need to log in again.")
-        finally:
-            close_playwright(playwright, context)
-
-    elif platform == PlatformEnum.FACEBOOK:
-        profile_path = "storage/browser_profiles/facebook_profile"
-        os.makedirs(profile_path, exist_ok=True)
-
-        print("🌐 Launching Facebook login browser...")
-        playwright, context = launch_stealth_browser(
-            user_data_dir=profile_path,
-            headless=False,
-            slow_mo=150,
-        )
-
-        try:
-            page = context.new_page()
-            page.goto("https://facebook.com",
-                      wait_until="domcontentloaded")
-
-            print("⚠️ Please log in manually in the opened browser window.")
-            print(
-                "Once logged in and your feed appears, close any popups, then return here.")
-            print(
-                "⏸️ Waiting for you to finish login (press Resume in Playwright Inspector if needed)...")
-            page.pause()
-
-            print(
-                "✅ Facebook session saved successfully. You won’t need to log in again.")
-        finally:
-            close_playwright(playwright, context)
-
-    else:
-        print(f"❌ Unsupported platform: {platform}")
+                f"⌛ Timed out waiting for {LOGIN_TARGETS[platform][0]} login.")
+    finally:
+        if view is not None:
+            view.close()
+        for context, _page in pending.values():
+            close_context(context, False)
+        if playwright is not None:
+            close_playwright(playwright, None)
+
+    if pending:
+        raise typer.Exit(code=1)
 
 
 def hello():
@@ -1,12 +1,25 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 import typer
-from valid_social_cli.services.instagram import post_to_instagram
-from valid_social_cli.services.x import post_to_x
-from valid_social_cli.services.facebook import post_to_facebook
+from valid_social_cli.services.instagram import (
+    open_instagram, publish_to_instagram, post_to_instagram)
+from valid_social_cli.services.x import open_x, publish_to_x, post_to_x
+from valid_social_cli.services.facebook import (
+    open_facebook, publish_to_facebook, post_to_facebook)
 from valid_social_cli.utils.get_media_files import get_media_files
+from valid_social_cli.utils.media_index import expand_media_paths
+from valid_social_cli.utils.prewarm import (
+    WarmSession, start_warm_sessions, cancel_warm_sessions)
+from valid_social_cli.utils.deadline import Deadline
 
 app = typer.Typer(help="🔐 Post to your social media accounts.")
 
+# Platforms whose browser can be warmed up while the user answers prompts.
+WARMABLE_PLATFORMS = {
+    "Instagram": (open_instagram, publish_to_instagram),
+    "X": (open_x, publish_to_x),
+    "Facebook": (open_facebook, publish_to_facebook),
+}
+
 
 def get_caption() -> str:
     lines: List[str] = []
@@ -96,51 +109,129 @@ def post(
     caption: Optional[str] = typer.Option(
         None, "--caption", "-c", help="Caption text"
     ),
-    media: Optional[str] = typer.Option(
-        None, "--media", "-m", help="Path to media file"
+    media: Optional[List[str]] = typer.Option(
+        None, "--media", "-m",
+        help="Media file, directory or glob (e.g., 'shoot/*.jpg'). Repeatable."
+    ),
+    flight_recorder: Optional[bool] = typer.Option(
+        None, "--flight-recorder/--no-flight-recorder",
+        help="Save a trace, screenshot and HAR when a posting step fails"
+    ),
+    asset_cache: Optional[bool] = typer.Option(
+        None, "--asset-cache/--no-asset-cache",
+        help="Serve static JS/CSS bundles from a local cache shared by all profiles"
+    ),
+    headless: Optional[bool] = typer.Option(
+        None, "--headless/--headed",
+        help="Run browsers without a window (default, or set VALID_SOCIAL_HEADLESS=0)"
+    ),
+    record_har: Optional[bool] = typer.Option(
+        None, "--record-har/--no-record-har",
+        help="Record the session to a scrubbed HAR bundle under storage/har/"
+    ),
+    replay_har: Optional[str] = typer.Option(
+        None, "--replay-har",
+        help="Replay a recording offline ('latest' or a bundle path); nothing is posted"
+    ),
+    deadline: Optional[float] = typer.Option(
+        None, "--deadline",
+        help="Seconds allowed for the whole post across all platforms"
+    ),
+    platform_deadline: Optional[float] = typer.Option(
+        None, "--platform-deadline",
+        help="Seconds allowed for each platform; a slow platform is cancelled"
     ),
 ):
     """
     Post content to multiple social media platforms.
     """
+    launch_options: Dict[str, Any] = {
+        "flight_recorder": flight_recorder,
+        "asset_cache": asset_cache,
+        "headless": headless,
+        "record_har": record_har,
+        "replay_har": replay_har,
+    }
+
     # Select platforms
     if not platforms:
         platforms = select_platforms()
     else:
         print(f"\n✅ Selected: {', '.join(platforms)}")
 
-    # Get caption
-    if not caption:
-        caption = get_caption()
+    # Warm up browsers while the user is still answering prompts
+    warm: Dict[str, WarmSession] = {}
+    if not caption or not media:
+        warm = start_warm_sessions(
+            {name: WARMABLE_PLATFORMS[name]
+             for name in platforms if name in WARMABLE_PLATFORMS},
+            launch_options,
+            platform_deadline,
+            deadline,
+        )
+
+    try:
+        # Get caption
+        if not caption:
+            caption = get_caption()
+
+        # Get media
+        if not media:
+            media_path = get_media_files()
+        else:
+            media_path = list(dict.fromkeys(expand_media_paths(media)))
+            if not media_path:
+                print("⚠️ --media did not match any media files.")
+
+        # The budgets start once the prompts are answered
+        post_deadline = Deadline(deadline)
+
+        def platform_budget() -> Deadline:
+            return Deadline(platform_deadline, parent=post_deadline)
+
+        # Handle Instagram
+        if "Instagram" in platforms:
+            if not isinstance(media_path, (str, list)) or not media_path:
+                print("⚠️ No media selected for Instagram.")
+                choice = input(
+                    "Do you want to skip Instagram upload? (yes/no): "
+                ).strip().lower()
+
+                if choice not in ("yes", "y"):
+                    print(
+                        "❌ Instagram upload canceled. Please select a media file next time.")
+                    raise typer.Exit()
+                else:
+                    print("✅ Skipping Instagram upload...")
+                    if "Instagram" in warm:
+                        warm.pop("Instagram").cancel()
+            elif "Instagram" in warm:
+                print("📸 Posting to Instagram...")
+                warm.pop("Instagram").publish(
+                    caption, media_path, platform_budget())
+            else:
+                post_to_instagram(caption, media_path,
+                                  platform_budget(), **launch_options)
 
-    # Get media
-    if not media:
-        media_path = get_media_files()
-    else:
-        media_path = media
-
-    # Handle Instagram
-    if "Instagram" in platforms:
-        if not isinstance(media_path, (str, list)) or not media_path:
-            print("⚠️ No media selected for Instagram.")
-            choice = input(
-                "Do you want to skip Instagram upload? (yes/no): "
-            ).strip().lower()
-
-            if choice not in ("yes", "y"):
-                print(
-                    "❌ Instagram upload canceled. Please select a media file next time.")
-                raise typer.Exit()
+        if "X" in platforms:
+            if "X" in warm:
+                print("Posting to x...")
+                warm.pop("X").publish(caption, media_path, platform_budget())
             else:
-                print("✅ Skipping Instagram upload...")
-        else:
-            post_to_instagram(caption, media_path)
-
-    if "X" in platforms:
-        post_to_x(caption, media_path)
-    if "Facebook" in platforms:
-        post_to_facebook(caption, media_path)
-    if "TikTok" in platforms:
-        print("🎵 TikTok upload coming soon.")
-    if "LinkedIn" in platforms:
-        print("🎵 LinkedIn upload coming soon.")
+                post_to_x(caption, media_path,
+                          platform_budget(), **launch_options)
+        if "Facebook" in platforms:
+            if "Facebook" in warm:
+                print("Posting to facebook...")
+                warm.pop("Facebook").publish(
+                    caption, media_path, platform_budget())
+            else:
+                post_to_facebook(caption, media_path,
+                                 platform_budget(), **launch_options)
+        if "TikTok" in platforms:
+            print("🎵 TikTok upload coming soon.")
+        if "LinkedIn" in platforms:
+            print("🎵 LinkedIn upload coming soon.")
+    finally:
+        # Throw away any warm-up that was not used (abort, skip or error)
+        cancel_warm_sessions(warm)
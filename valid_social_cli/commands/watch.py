@@ -0,0 +1,170 @@
+import os
+from typing import Any, Dict, List, Optional
+import typer
+from valid_social_cli.commands.post import WARMABLE_PLATFORMS
+from valid_social_cli.utils.browser_session import BrowserSession
+from valid_social_cli.utils.deadline import Deadline, DeadlineExceeded
+from valid_social_cli.utils.folder_watcher import (
+    DEFAULT_CAPTION_GRACE_SECONDS,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_SETTLE_SECONDS,
+    MediaBatcher,
+    MediaGroup,
+    create_watcher,
+)
+
+app = typer.Typer(help="👀 Watch a folder and post new media automatically.")
+
+
+def _ensure_session(
+    name: str,
+    sessions: Dict[str, BrowserSession],
+    launch_options: Dict[str, Any],
+    seconds: Optional[float] = None,
+) -> Optional[BrowserSession]:
+    """Return the platform's live session, relaunching it if it was lost."""
+    opener, _publisher = WARMABLE_PLATFORMS[name]
+    session = sessions.get(name)
+
+    if session is not None:
+        if not session.closed and not session.page.is_closed():
+            return session
+        print(f"⚠️ {name} browser was lost. Relaunching...")
+        session.close(False)
+        del sessions[name]
+
+    try:
+        session = opener(Deadline(seconds), **launch_options)
+    except DeadlineExceeded as exc:
+        print(f"⏱️ Opening {name} cancelled: {exc}")
+        return None
+    if session is not None:
+        sessions[name] = session
+    return session
+
+
+def _publish_group(
+    group: MediaGroup,
+    platforms: List[str],
+    default_caption: Optional[str],
+    sessions: Dict[str, BrowserSession],
+    launch_options: Dict[str, Any],
+    seconds: Optional[float] = None,
+) -> None:
+    caption = group.read_caption() or default_caption or ""
+    names = ", ".join(os.path.basename(p) for p in group.media)
+    print(f"\n📦 New post '{group.key}': {names}")
+
+    for name in platforms:
+        session = _ensure_session(name, sessions, launch_options, seconds)
+        if session is None:
+            continue
+        _opener, publisher = WARMABLE_PLATFORMS[name]
+        print(f"➡️ Posting to {name}...")
+        try:
+            session.reset_deadline(Deadline(seconds))
+            publisher(session, caption, group.media)
+        except DeadlineExceeded as exc:
+            # The page may be stuck mid-dialog; relaunch it for the next post.
+            session.capture_failure(exc)
+            print(f"⏱️ Posting '{group.key}' to {name} cancelled: {exc}")
+            session.close(False)
+            continue
+        except Exception as exc:
+            print(f"❌ Posting '{group.key}' to {name} failed: {exc}")
+
+        # Back to the feed so the session is ready for the next post.
+        session.release_upload()
+        try:
+            session.reset_deadline()
+            session.page.goto(session.home_url, wait_until="domcontentloaded")
+        except Exception:
+            session.close(False)
+
+
+@app.callback(invoke_without_command=True)
+def watch(
+    directory: str = typer.Argument(..., help="Folder to watch for new media"),
+    platforms: List[str] = typer.Option(
+        ..., "--platform", "-p", help="Platforms to post on (e.g., Instagram, X)"
+    ),
+    caption: Optional[str] = typer.Option(
+        None, "--caption", "-c",
+        help="Caption used when a post has no sidecar .txt/.caption file"
+    ),
+    settle: float = typer.Option(
+        DEFAULT_SETTLE_SECONDS, "--settle",
+        help="Seconds a file must stay unchanged before it is posted"
+    ),
+    caption_grace: float = typer.Option(
+        DEFAULT_CAPTION_GRACE_SECONDS, "--caption-grace",
+        help="Extra seconds media without a sidecar caption waits for one"
+    ),
+    poll_interval: float = typer.Option(
+        DEFAULT_POLL_INTERVAL, "--poll-interval",
+        help="Polling interval when inotify is not available"
+    ),
+    existing: bool = typer.Option(
+        False, "--existing", help="Also post files already in the folder"
+    ),
+    flight_recorder: Optional[bool] = typer.Option(
+        None, "--flight-recorder/--no-flight-recorder",
+        help="Save a trace, screenshot and HAR when a posting step fails"
+    ),
+    asset_cache: Optional[bool] = typer.Option(
+        None, "--asset-cache/--no-asset-cache",
+        help="Serve static JS/CSS bundles from a local cache shared by all profiles"
+    ),
+    headless: Optional[bool] = typer.Option(
+        None, "--headless/--headed",
+        help="Run browsers without a window (default, or set VALID_SOCIAL_HEADLESS=0)"
+    ),
+    deadline: Optional[float] = typer.Option(
+        None, "--deadline",
+        help="Seconds allowed for each post on each platform"
+    ),
+):
+    """
+    Watch a folder and stream new media into posts, keeping one browser
+    session per platform open for the whole run.
+    """
+    directory = os.path.abspath(directory)
+    if not os.path.isdir(directory):
+        print(f"❌ Not a folder: {directory}")
+        raise typer.Exit(code=1)
+
+    unsupported = [p for p in platforms if p not in WARMABLE_PLATFORMS]
+    if unsupported:
+        print(f"❌ Unsupported platform(s): {', '.join(unsupported)}")
+        raise typer.Exit(code=1)
+
+    launch_options: Dict[str, Any] = {
+        "flight_recorder": flight_recorder,
+        "asset_cache": asset_cache,
+        "headless": headless,
+    }
+    sessions: Dict[str, BrowserSession] = {}
+    watcher = create_watcher(directory, poll_interval)
+    batcher = MediaBatcher(directory, settle, include_existing=existing,
+                           caption_grace=caption_grace)
+
+    try:
+        # Launch every platform up front so the first asset goes out quickly.
+        for name in platforms:
+            print(f"🌐 Opening {name}...")
+            _ensure_session(name, sessions, launch_options, deadline)
+
+        print(f"👀 Watching {directory} for new media. Press Ctrl+C to stop.")
+        while True:
+            # Sleep until the folder changes, or re-check soon while files settle
+            watcher.wait(batcher.next_timeout())
+            batcher.scan()
+            for group in batcher.pop_ready():
+                _publish_group(group, platforms, caption,
+                               sessions, launch_options, deadline)
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping watch.")
+    finally:
+        watcher.close()
+        for session in sessions.values():
+            session.close()
@@ -1,6 +1,7 @@
 import typer
 from valid_social_cli.commands.login import app as login_app
 from valid_social_cli.commands.post import app as post_app
+from valid_social_cli.commands.watch import app as watch_app
 
 app = typer.Typer(
     name="Valid Social CLI",
@@ -10,6 +11,7 @@ app = typer.Typer(
 # Register sub-apps
 app.add_typer(login_app, name="login")
 app.add_typer(post_app, name="post")
+app.add_typer(watch_app, name="watch")
 
 
 @app.command()
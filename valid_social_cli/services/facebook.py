@@ -1,36 +1,57 @@
 import os
-import time
 import re
-import random
-from typing import List, Union, Optional
+from typing import Any, List, Union, Optional
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from valid_social_cli.utils.stealth_browser import launch_stealth_browser, close_playwright
-
-
-def human_delay(min_sec: float = 0.8, max_sec: float = 2.2):
-    """Wait a random short time to mimic human behavior."""
-    time.sleep(random.uniform(min_sec, max_sec))
+from valid_social_cli.utils.browser_session import BrowserSession
+from valid_social_cli.utils.deadline import Deadline, DeadlineExceeded
+from valid_social_cli.utils.har_harness import ReplayNotFound
+from valid_social_cli.utils.media_transfer import MediaTransferError, set_media_files
 
 
 FACEBOOK_PROFILE_PATH = "storage/browser_profiles/facebook_profile"
-
-
-def post_to_facebook(caption: str, media_path: Optional[Union[str, List[str]]] = None) -> None:
-    print("Posting to facebook...")
-
+FACEBOOK_HOME_URL = "https://web.facebook.com"
+
+
+def open_facebook(
+    deadline: Optional[Deadline] = None,
+    **launch_options: Any,
+) -> Optional[BrowserSession]:
+    """
+    Launches the Facebook profile, loads the feed and checks the login state.
+    Returns None (with the browser closed) if the user isn't logged in.
+    Keyword arguments are forwarded to launch_stealth_browser.
+    """
+    deadline = deadline or Deadline()
     # Ensure browser profile directory exists
     os.makedirs(FACEBOOK_PROFILE_PATH, exist_ok=True)
 
     # Launch stealth browser using persistent user_data_dir
-    playwright, context = launch_stealth_browser(
-        user_data_dir=FACEBOOK_PROFILE_PATH,
-        headless=False,
-        slow_mo=150,
-    )
-
+    launch_options.setdefault("slow_mo", 150)
+    try:
+        playwright, context = launch_stealth_browser(
+            user_data_dir=FACEBOOK_PROFILE_PATH,
+            deadline=deadline,
+            **launch_options,
+        )
+    except ReplayNotFound as exc:
+        print(f"⏭️ Skipping Facebook: {exc}.")
+        return None
+    except PlaywrightTimeoutError as exc:
+        deadline.raise_for_timeout("launch", exc)
+        raise
+    except Exception:
+        deadline.check("launch")
+        raise
+
+    session: Optional[BrowserSession] = None
     try:
         page = context.new_page()
-        page.goto("https://web.facebook.com", wait_until="domcontentloaded")
-        human_delay(5, 8)
+        session = BrowserSession(
+            playwright, context, page, FACEBOOK_HOME_URL, deadline)
+        session.step("load feed", "navigation")
+        page.goto(FACEBOOK_HOME_URL, wait_until="domcontentloaded")
+        session.human_delay(5, 8)
 
         # --- LOGIN CHECK ---
         login_button = page.locator("div").filter(
@@ -39,70 +60,128 @@ def post_to_facebook(caption: str, media_path: Optional[Union[str, List[str]]] =
             if login_button.is_visible():
                 print("⚠️ You are not logged in to facebook.")
                 print("➡️ Please run: valid-social login -p facebook")
-                close_playwright(playwright, context, False)
-                return
+                session.close(False)
+                return None
         except Exception:
             # If the element doesn't exist, it means you're already logged in
             pass
 
-        # --- OPEN NEW POST DIALOG ---
-        try:
-            post_dialog = page.locator(
-                "div[role='button']", has_text=re.compile("what's on your mind", re.I))
-            if post_dialog:
-                post_dialog.first.click()
-                print("🪶 Opened post dialog.")
-            else:
-                raise Exception("Post dialog button not found.")
-        except Exception:
-            print("❌ Could not find 'What's on your mind' button — UI may have changed.")
-            close_playwright(playwright, context)
+        return session
+    except BaseException as exc:
+        if session is not None and isinstance(exc, (DeadlineExceeded, PlaywrightTimeoutError)):
+            session.capture_failure(exc)
+        close_playwright(playwright, context)
+        if isinstance(exc, PlaywrightTimeoutError):
+            deadline.raise_for_timeout("load feed", exc)
+        raise
+
+
+def publish_to_facebook(
+    session: BrowserSession,
+    caption: str,
+    media_path: Optional[Union[str, List[str]]] = None,
+) -> None:
+    """
+    Composes and publishes a post from an open, logged-in Facebook session.
+    """
+    page = session.page
+    recorder = session.recorder
+
+    # --- OPEN NEW POST DIALOG ---
+    session.step("open post dialog", "composer")
+    try:
+        post_dialog = page.locator(
+            "div[role='button']", has_text=re.compile("what's on your mind", re.I))
+        if post_dialog:
+            post_dialog.first.click()
+            print("🪶 Opened post dialog.")
+        else:
+            raise Exception("Post dialog button not found.")
+    except Exception as exc:
+        print("❌ Could not find 'What's on your mind' button — UI may have changed.")
+        recorder.capture_failure(page, "open post dialog", exc)
+        return
 
-        human_delay(2, 4)
+    session.human_delay(2, 4)
 
-        # --- TYPE CAPTION ---
+    # --- TYPE CAPTION ---
+    session.step("type caption", "composer")
+    try:
+        textarea = page.locator("div[role='textbox']").first
+        session.type_slowly(textarea, caption, 40, 120)
+        print("✅ Caption entered successfully.")
+        session.human_delay(1, 2)
+    except Exception as exc:
+        print("⚠️ Could not find caption text area. Skipping caption.")
+        recorder.capture_failure(page, "type caption", exc)
+
+    # --- UPLOAD MEDIA (OPTIONAL) ---
+    if media_path:
+        session.step("upload media", "upload")
         try:
-            textarea = page.locator("div[role='textbox']").first
-            for char in caption:
-                textarea.type(char, delay=random.uniform(40, 120))
-            print("✅ Caption entered successfully.")
-            human_delay(1, 2)
-        except Exception:
-            print("⚠️ Could not find caption text area. Skipping caption.")
-
-        # --- UPLOAD MEDIA (OPTIONAL) ---
-        if media_path:
-            try:
-                file_input = page.locator('input[type="file"]').first
-                files = [media_path] if isinstance(
-                    media_path, str) else media_path
-                file_input.set_input_files(files)
-                print(f"✅ Uploaded {len(files)} media file(s).")
-                human_delay(3, 6)
-            except Exception:
-                print("❌ Could not find file input — UI may have changed.")
-        else:
-            print("ℹ️ No media provided. Posting text-only tweet.")
-
-        # --- Click Next ---
-        for _ in range(2):
-            try:
-                next_btn = page.locator("div").filter(
-                    has_text=re.compile(r"^Next$")).nth(1)
-                next_btn.click()
-                human_delay(2, 4)
-            except Exception:
-                print("⚠️ Could not click 'Next' — skipping.")
-                continue
-
-        # --- POST ---
+            file_input = page.locator('input[type="file"]').first
+            session.admit_upload(media_path)
+            files = set_media_files(file_input, media_path)
+            print(f"✅ Uploaded {len(files)} media file(s).")
+            session.human_delay(3, 6)
+        except MediaTransferError as exc:
+            print(f"❌ {exc}")
+            return
+        except Exception as exc:
+            print("❌ Could not find file input — UI may have changed.")
+            recorder.capture_failure(page, "upload media", exc)
+    else:
+        print("ℹ️ No media provided. Posting text-only tweet.")
+
+    # --- Click Next ---
+    for _ in range(2):
+        session.step("click next", "upload")
         try:
-            share_button = page.locator('[aria-label="Post"]')
-            share_button.click()
-            human_delay(5, 8)
-            print("✅ Post published to Facebook successfully!")
+            next_btn = page.locator("div").filter(
+                has_text=re.compile(r"^Next$")).nth(1)
+            next_btn.click()
+            session.human_delay(2, 4)
         except Exception:
-            print("❌ Failed to click final 'Post' button. UI may have changed.")
+            print("⚠️ Could not click 'Next' — skipping.")
+            continue
 
-    finally:
-        close_playwright(playwright, context)
+    # --- POST ---
+    session.step("publish", "publish")
+    try:
+        share_button = page.locator('[aria-label="Post"]')
+        share_button.click()
+        session.human_delay(5, 8)
+        session.finish_upload()
+        print("✅ Post published to Facebook successfully!")
+    except Exception as exc:
+        print("❌ Failed to click final 'Post' button. UI may have changed.")
+        recorder.capture_failure(page, "publish", exc)
+
+
+def post_to_facebook(
+    caption: str,
+    media_path: Optional[Union[str, List[str]]] = None,
+    deadline: Optional[Deadline] = None,
+    **launch_options: Any,
+) -> None:
+    """
+    Posts to Facebook using an existing logged-in session.
+    Extra keyword arguments are forwarded to launch_stealth_browser.
+    The attempt is cancelled, and the browser closed, if ``deadline`` runs out.
+    """
+    print("Posting to facebook...")
+
+    try:
+        session = open_facebook(deadline, **launch_options)
+        if session is None:
+            return
+
+        try:
+            publish_to_facebook(session, caption, media_path)
+        except DeadlineExceeded as exc:
+            session.capture_failure(exc)
+            raise
+        finally:
+            session.close()
+    except DeadlineExceeded as exc:
+        print(f"⏱️ Posting to Facebook cancelled: {exc}")
@@ -1,38 +1,55 @@
 import os
-import time
-import random
 import re
-from typing import List, Union
+from typing import Any, List, Optional, Union
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from valid_social_cli.utils.stealth_browser import launch_stealth_browser, close_playwright
-
-
-def human_delay(min_sec: float = 0.8, max_sec: float = 2.2):
-    """Wait a random short time to mimic human behavior."""
-    time.sleep(random.uniform(min_sec, max_sec))
+from valid_social_cli.utils.browser_session import BrowserSession
+from valid_social_cli.utils.deadline import Deadline, DeadlineExceeded
+from valid_social_cli.utils.har_harness import ReplayNotFound
+from valid_social_cli.utils.media_transfer import MediaTransferError, set_media_files
 
 
 INSTAGRAM_PROFILE_PATH = "storage/browser_profiles/instagram_profile"
+INSTAGRAM_HOME_URL = "https://www.instagram.com/"
 
 
-def post_to_instagram(caption: str, image_path: Union[str, List[str]]):
+def open_instagram(
+    deadline: Optional[Deadline] = None,
+    **launch_options: Any,
+) -> Optional[BrowserSession]:
     """
-    Posts to Instagram using an existing logged-in session.
-    If the user isn't logged in, instructs them to use the CLI login command.
+    Launches the Instagram profile, loads the feed and checks the login state.
+    Returns None (with the browser closed) if the user isn't logged in.
+    Keyword arguments are forwarded to launch_stealth_browser.
     """
-    print("📸 Posting to Instagram...")
-
+    deadline = deadline or Deadline()
     os.makedirs(INSTAGRAM_PROFILE_PATH, exist_ok=True)
 
-    playwright, context = launch_stealth_browser(
-        user_data_dir=INSTAGRAM_PROFILE_PATH,
-        headless=True,
-        slow_mo=150,
-    )
-
+    launch_options.setdefault("slow_mo", 150)
+    try:
+        playwright, context = launch_stealth_browser(
+            user_data_dir=INSTAGRAM_PROFILE_PATH,
+            deadline=deadline,
+            **launch_options,
+        )
+    except ReplayNotFound as exc:
+        print(f"⏭️ Skipping Instagram: {exc}.")
+        return None
+    except PlaywrightTimeoutError as exc:
+        deadline.raise_for_timeout("launch", exc)
+        raise
+    except Exception:
+        deadline.check("launch")
+        raise
+
+    session: Optional[BrowserSession] = None
     try:
         page = context.new_page()
-        page.goto("https://www.instagram.com/", wait_until="domcontentloaded")
-        human_delay(5, 8)
+        session = BrowserSession(
+            playwright, context, page, INSTAGRAM_HOME_URL, deadline)
+        session.step("load feed", "navigation")
+        page.goto(INSTAGRAM_HOME_URL, wait_until="domcontentloaded")
+        session.human_delay(5, 8)
 
         # Check login state
         try:
@@ -41,72 +58,133 @@ def post_to_instagram(caption: str, image_path: Union[str, List[str]]):
             if login_button.is_visible():
                 print("⚠️ You are not logged in to Instagram.")
                 print("➡️ Please run: valid-social login -p instagram")
-                close_playwright(playwright, context, False)
-                return
+                session.close(False)
+                return None
         except Exception:
             pass  # Already logged in
 
-        # --- Create New Post ---
-        try:
-            page.get_by_role("link", name="New post Create").click()
-            human_delay(2, 4)
-        except Exception:
-            print("❌ Could not find 'New post' button — UI may have changed.")
-            return
+        return session
+    except BaseException as exc:
+        if session is not None and isinstance(exc, (DeadlineExceeded, PlaywrightTimeoutError)):
+            session.capture_failure(exc)
+        close_playwright(playwright, context)
+        if isinstance(exc, PlaywrightTimeoutError):
+            deadline.raise_for_timeout("load feed", exc)
+        raise
 
-        try:
-            page.get_by_role("link", name="Post Post").click()
-            human_delay(2, 4)
-        except Exception:
-            print("⚠️ 'Post' link not found. Continuing anyway.")
 
-        # --- Upload Media ---
-        try:
-            page.get_by_text(
-                "Icon to represent media such as images or videosDrag photos and videos"
-            ).click()
-            human_delay(2, 4)
-        except Exception:
-            print("⚠️ Could not find upload container. Trying direct upload...")
+def publish_to_instagram(
+    session: BrowserSession,
+    caption: str,
+    image_path: Union[str, List[str]],
+) -> None:
+    """
+    Creates and shares a post from an open, logged-in Instagram session.
+    """
+    page = session.page
+    recorder = session.recorder
 
-        try:
-            file_input = page.locator('input[type="file"]').first
-            file_input.set_input_files(image_path)
-            print("✅ Media file(s) selected successfully.")
-        except Exception:
-            print("❌ Could not find file input field — UI may have changed.")
-            return
+    # --- Create New Post ---
+    session.step("open post dialog", "composer")
+    try:
+        page.get_by_role("link", name="New post Create").click()
+        session.human_delay(2, 4)
+    except Exception as exc:
+        print("❌ Could not find 'New post' button — UI may have changed.")
+        recorder.capture_failure(page, "open post dialog", exc)
+        return
 
-        human_delay(3, 6)
+    try:
+        page.get_by_role("link", name="Post Post").click()
+        session.human_delay(2, 4)
+    except Exception:
+        print("⚠️ 'Post' link not found. Continuing anyway.")
 
-        # --- Click Next ---
-        for _ in range(2):
-            try:
-                next_btn = page.locator("div").filter(
-                    has_text=re.compile(r"^Next$")).nth(1)
-                next_btn.click()
-                human_delay(2, 4)
-            except Exception:
-                print("⚠️ Could not click 'Next' — skipping.")
-                continue
+    # --- Upload Media ---
+    session.step("upload media", "upload")
+    try:
+        page.get_by_text(
+            "Icon to represent media such as images or videosDrag photos and videos"
+        ).click()
+        session.human_delay(2, 4)
+    except Exception:
+        print("⚠️ Could not find upload container. Trying direct upload...")
 
-        # --- Write Caption ---
+    try:
+        file_input = page.locator('input[type="file"]').first
+        session.admit_upload(image_path)
+        set_media_files(file_input, image_path)
+        print("✅ Media file(s) selected successfully.")
+    except MediaTransferError as exc:
+        print(f"❌ {exc}")
+        return
+    except Exception as exc:
+        print("❌ Could not find file input field — UI may have changed.")
+        recorder.capture_failure(page, "upload media", exc)
+        return
+
+    session.human_delay(3, 6)
+
+    # --- Click Next ---
+    for _ in range(2):
+        session.step("click next", "upload")
         try:
-            textarea = page.get_by_role("textbox", name="Write a caption...")
-            for char in caption:
-                textarea.type(char, delay=random.uniform(50, 150))
-            print("✅ Caption entered successfully.")
-            human_delay(1, 2)
+            next_btn = page.locator("div").filter(
+                has_text=re.compile(r"^Next$")).nth(1)
+            next_btn.click()
+            session.human_delay(2, 4)
         except Exception:
-            print("⚠️ Could not find caption field. Skipping caption.")
+            print("⚠️ Could not click 'Next' — skipping.")
+            continue
 
-        # --- Publish ---
-        try:
-            page.get_by_role("button", name="Share", exact=True).click()
-            human_delay(5, 8)
-            print("✅ Post published to Instagram successfully!")
-        except Exception:
-            print("❌ Failed to share post. Please verify UI elements.")
+    # --- Write Caption ---
+    session.step("type caption", "composer")
+    try:
+        textarea = page.get_by_role("textbox", name="Write a caption...")
+        session.type_slowly(textarea, caption, 50, 150)
+        print("✅ Caption entered successfully.")
+        session.human_delay(1, 2)
+    except Exception as exc:
+        print("⚠️ Could not find caption field. Skipping caption.")
+        recorder.capture_failure(page, "type caption", exc)
+
+    # --- Publish ---
+    session.step("publish", "publish")
+    try:
+        page.get_by_role("button", name="Share", exact=True).click()
+        session.human_delay(5, 8)
+        session.finish_upload()
+        print("✅ Post published to Instagram successfully!")
+    except Exception as exc:
+        print("❌ Failed to share post. Please verify UI elements.")
+        recorder.capture_failure(page, "publish", exc)
+
+
+def post_to_instagram(
+    caption: str,
+    image_path: Union[str, List[str]],
+    deadline: Optional[Deadline] = None,
+    **launch_options: Any,
+):
+    """
+    Posts to Instagram using an existing logged-in session.
+    If the user isn't logged in, instructs them to use the CLI login command.
+    Extra keyword arguments are forwarded to launch_stealth_browser.
+    The attempt is cancelled, and the browser closed, if ``deadline`` runs out.
+    """
+    print("📸 Posting to Instagram...")
 
-    finally:
-        close_playwright(playwright, context)
+    try:
+        session = open_instagram(deadline, **launch_options)
+        if session is None:
+            return
+
+        try:
+            publish_to_instagram(session, caption, image_path)
+        except DeadlineExceeded as exc:
+            session.capture_failure(exc)
+            raise
+        finally:
+            session.close()
+    except DeadlineExceeded as exc:
+        print(f"⏱️ Posting to Instagram cancelled: {exc}")
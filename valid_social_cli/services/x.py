@@ -1,35 +1,56 @@
 import os
-import time
-import random
-from typing import List, Union, Optional
+from typing import Any, List, Union, Optional
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from valid_social_cli.utils.stealth_browser import launch_stealth_browser, close_playwright
-
-
-def human_delay(min_sec: float = 0.8, max_sec: float = 2.2):
-    """Wait a random short time to mimic human behavior."""
-    time.sleep(random.uniform(min_sec, max_sec))
+from valid_social_cli.utils.browser_session import BrowserSession
+from valid_social_cli.utils.deadline import Deadline, DeadlineExceeded
+from valid_social_cli.utils.har_harness import ReplayNotFound
+from valid_social_cli.utils.media_transfer import MediaTransferError, set_media_files
 
 
 X_PROFILE_PATH = "storage/browser_profiles/x_profile"
-
-
-def post_to_x(caption: str, media_path: Optional[Union[str, List[str]]] = None) -> None:
-    print("Posting to x...")
-
+X_HOME_URL = "https://x.com/home"
+
+
+def open_x(
+    deadline: Optional[Deadline] = None,
+    **launch_options: Any,
+) -> Optional[BrowserSession]:
+    """
+    Launches the X profile, loads the home feed and checks the login state.
+    Returns None (with the browser closed) if the user isn't logged in.
+    Keyword arguments are forwarded to launch_stealth_browser.
+    """
+    deadline = deadline or Deadline()
     # Ensure browser profile directory exists
     os.makedirs(X_PROFILE_PATH, exist_ok=True)
 
     # Launch stealth browser using persistent user_data_dir
-    playwright, context = launch_stealth_browser(
-        user_data_dir=X_PROFILE_PATH,
-        headless=True,
-        slow_mo=150,
-    )
-
+    launch_options.setdefault("slow_mo", 150)
+    try:
+        playwright, context = launch_stealth_browser(
+            user_data_dir=X_PROFILE_PATH,
+            deadline=deadline,
+            **launch_options,
+        )
+    except ReplayNotFound as exc:
+        print(f"⏭️ Skipping X: {exc}.")
+        return None
+    except PlaywrightTimeoutError as exc:
+        deadline.raise_for_timeout("launch", exc)
+        raise
+    except Exception:
+        deadline.check("launch")
+        raise
+
+    session: Optional[BrowserSession] = None
     try:
         page = context.new_page()
-        page.goto("https://x.com/home", wait_until="domcontentloaded")
-        human_delay(5, 8)
+        session = BrowserSession(
+            playwright, context, page, X_HOME_URL, deadline)
+        session.step("load feed", "navigation")
+        page.goto(X_HOME_URL, wait_until="domcontentloaded")
+        session.human_delay(5, 8)
 
         # --- TRY AGAIN CHECK ---
         try:
@@ -52,59 +73,116 @@ def post_to_x(caption: str, media_path: Optional[Union[str, List[str]]] = None)
                     "flow/login" in current_url):
                 print("⚠️ You are not logged in to X.")
                 print("➡️ Please run: valid-social login -p x")
-                close_playwright(playwright, context, False)
-                return
+                session.close(False)
+                return None
         except Exception:
             # If the element doesn't exist, it means you're already logged in
             pass
 
-        # --- OPEN NEW POST DIALOG ---
-        try:
-            post_link = page.get_by_role("link", name="Post")
-            if post_link:
-                post_link.first.click()
-                print("🪶 Opened post dialog.")
-            else:
-                raise Exception("Post button not found.")
-        except Exception:
-            print("❌ Could not find 'Post Link' button — UI may have changed.")
-            close_playwright(playwright, context)
+        return session
+    except BaseException as exc:
+        if session is not None and isinstance(exc, (DeadlineExceeded, PlaywrightTimeoutError)):
+            session.capture_failure(exc)
+        close_playwright(playwright, context)
+        if isinstance(exc, PlaywrightTimeoutError):
+            deadline.raise_for_timeout("load feed", exc)
+        raise
+
+
+def publish_to_x(
+    session: BrowserSession,
+    caption: str,
+    media_path: Optional[Union[str, List[str]]] = None,
+) -> None:
+    """
+    Composes and publishes a post from an open, logged-in X session.
+    """
+    page = session.page
+    recorder = session.recorder
+
+    # --- OPEN NEW POST DIALOG ---
+    session.step("open post dialog", "composer")
+    try:
+        post_link = page.get_by_role("link", name="Post")
+        if post_link:
+            post_link.first.click()
+            print("🪶 Opened post dialog.")
+        else:
+            raise Exception("Post button not found.")
+    except Exception as exc:
+        print("❌ Could not find 'Post Link' button — UI may have changed.")
+        recorder.capture_failure(page, "open post dialog", exc)
+        return
 
-        human_delay(2, 4)
+    session.human_delay(2, 4)
 
-        # --- TYPE CAPTION ---
+    # --- TYPE CAPTION ---
+    session.step("type caption", "composer")
+    try:
+        textarea = page.locator("div[role='textbox']").first
+        session.type_slowly(textarea, caption, 40, 120)
+        print("✅ Caption entered successfully.")
+        session.human_delay(1, 2)
+    except Exception as exc:
+        print("⚠️ Could not find caption text area. Skipping caption.")
+        recorder.capture_failure(page, "type caption", exc)
+
+    # --- UPLOAD MEDIA (OPTIONAL) ---
+    if media_path:
+        session.step("upload media", "upload")
         try:
-            textarea = page.locator("div[role='textbox']").first
-            for char in caption:
-                textarea.type(char, delay=random.uniform(40, 120))
-            print("✅ Caption entered successfully.")
-            human_delay(1, 2)
-        except Exception:
-            print("⚠️ Could not find caption text area. Skipping caption.")
-
-        # --- UPLOAD MEDIA (OPTIONAL) ---
-        if media_path:
-            try:
-                file_input = page.locator('input[type="file"]').first
-                files = [media_path] if isinstance(
-                    media_path, str) else media_path
-                file_input.set_input_files(files)
-                print(f"✅ Uploaded {len(files)} media file(s).")
-                human_delay(3, 6)
-            except Exception:
-                print("❌ Could not find file input — UI may have changed.")
-        else:
-            print("ℹ️ No media provided. Posting text-only tweet.")
+            file_input = page.locator('input[type="file"]').first
+            session.admit_upload(media_path)
+            files = set_media_files(file_input, media_path)
+            print(f"✅ Uploaded {len(files)} media file(s).")
+            session.human_delay(3, 6)
+        except MediaTransferError as exc:
+            print(f"❌ {exc}")
+            return
+        except Exception as exc:
+            print("❌ Could not find file input — UI may have changed.")
+            recorder.capture_failure(page, "upload media", exc)
+    else:
+        print("ℹ️ No media provided. Posting text-only tweet.")
+
+    # --- POST ---
+    session.step("publish", "publish")
+    try:
+        share_button = page.locator(
+            'button[data-testid="tweetButton"]:not([disabled])')
+        share_button.click()
+        session.human_delay(5, 8)
+        session.finish_upload()
+        print("✅ Post published to X successfully!")
+    except Exception as exc:
+        print("❌ Failed to click final 'Post' button. UI may have changed.")
+        recorder.capture_failure(page, "publish", exc)
+
+
+def post_to_x(
+    caption: str,
+    media_path: Optional[Union[str, List[str]]] = None,
+    deadline: Optional[Deadline] = None,
+    **launch_options: Any,
+) -> None:
+    """
+    Posts to X using an existing logged-in session.
+    Extra keyword arguments are forwarded to launch_stealth_browser.
+    The attempt is cancelled, and the browser closed, if ``deadline`` runs out.
+    """
+    print("Posting to x...")
 
-        # --- POST ---
-        try:
-            share_button = page.locator(
-                'button[data-testid="tweetButton"]:not([disabled])')
-            share_button.click()
-            human_delay(5, 8)
-            print("✅ Post published to X successfully!")
-        except Exception:
-            print("❌ Failed to click final 'Post' button. UI may have changed.")
+    try:
+        session = open_x(deadline, **launch_options)
+        if session is None:
+            return
 
-    finally:
-        close_playwright(playwright, context)
+        try:
+            publish_to_x(session, caption, media_path)
+        except DeadlineExceeded as exc:
+            session.capture_failure(exc)
+            raise
+        finally:
+            session.close()
+    except DeadlineExceeded as exc:
+        print(f"⏱️ Posting to X cancelled: {exc}")
@@ -0,0 +1,334 @@
+"""
+Content-addressed cache of immutable static assets shared by all profiles.
+
+Every persistent profile keeps its own Chromium HTTP cache, so the same
+hash-named JS/CSS bundles are downloaded once per profile, and again after a
+profile is pruned or on a fresh CI runner. When enabled, a context-level
+route serves those bundles from one local store instead:
+
+    storage/asset_cache/
+        index.json           url -> blob hash, headers, size, last use
+        blobs/ab/abcdef...   response bodies, named by their SHA-256
+
+Only GET requests for hash-named bundles on the platforms' static CDNs are
+intercepted; everything else goes to the network untouched. The store is
+bounded by ``max_bytes`` with least-recently-used eviction, and each context
+reports its hit rate when it closes. Blobs missing from the index (e.g. left
+by a process that died before saving it) are found by scanning ``blobs/`` at
+startup. They count towards the cap by modification time and are evicted
+like any other blob.
+
+Note: Playwright turns off Chromium's own HTTP cache for a context once any
+route is registered on it, which is why the cache is opt-in.
+
+Usage:
+    playwright, context = launch_stealth_browser(asset_cache=True)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional, Pattern, Tuple
+from playwright.sync_api import BrowserContext, Request, Route
+from valid_social_cli.utils.env_flags import env_flag
+
+ASSET_CACHE_DIR: str = os.path.join("storage", "asset_cache")
+ASSET_CACHE_ENV: str = "VALID_SOCIAL_ASSET_CACHE"
+DEFAULT_MAX_BYTES: int = 512 * 1024 * 1024  # 512 MB
+
+# Static CDNs serving the platforms' versioned bundles.
+STATIC_HOST_PATTERN: Pattern[str] = re.compile(
+    r"^https://(abs\.twimg\.com|static\.cdninstagram\.com|static\.xx\.fbcdn\.net)/")
+
+# Immutable bundles: Meta's rsrc.php paths, or file names carrying a hash
+# (e.g. main.6a7c8b1a.js, AbC12dEf34.css).
+HASHED_ASSET_PATTERN: Pattern[str] = re.compile(
+    r"(/rsrc\.php/.+|[./_-][A-Za-z0-9_-]*\d[A-Za-z0-9_-]*\.)"
+    r"(js|css|woff2?|ttf)(\?|$)")
+
+# Response headers worth replaying. Encoding and length headers are dropped
+# because the stored body is already decoded.
+KEPT_HEADERS = (
+    "content-type",
+    "cache-control",
+    "access-control-allow-origin",
+    "cross-origin-resource-policy",
+    "timing-allow-origin",
+)
+
+# Index writes are batched; it is also saved whenever a context detaches.
+SAVE_EVERY = 25
+# Unindexed blobs younger than this may belong to a live process that has
+# not saved its index yet; older ones are orphans of a crashed run.
+ORPHAN_GRACE_SECONDS = 3600.0
+
+# Contexts with the cache attached, keyed by id(context).
+_ATTACHED: Dict[int, "AssetCacheStats"] = {}
+_STORE: Optional["AssetStore"] = None
+_STORE_LOCK = threading.Lock()
+
+
+def asset_cache_enabled(flag: Optional[bool] = None) -> bool:
+    """
+    Resolve whether the asset cache should be used.
+
+    An explicit flag wins; otherwise the VALID_SOCIAL_ASSET_CACHE
+    environment variable is consulted (see env_flag).
+    """
+    return env_flag(ASSET_CACHE_ENV, flag)
+
+
+def is_immutable_asset(url: str) -> bool:
+    """Return True for hash-named static bundles on a known platform CDN."""
+    return bool(STATIC_HOST_PATTERN.match(url) and HASHED_ASSET_PATTERN.search(url))
+
+
+def _is_cacheable_response(status: int, headers: Dict[str, str]) -> bool:
+    cache_control = headers.get("cache-control", "").lower()
+    return status == 200 and "no-store" not in cache_control and "private" not in cache_control
+
+
+class AssetStore:
+    """Content-addressed blob store with an LRU-bounded URL index."""
+
+    def __init__(self, root: str = ASSET_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(root, "index.json")
+        self.lock = threading.Lock()
+        # url -> {"blob": sha256, "headers": {...}, "size": int, "last_used": float}
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # Blobs on disk that no index entry points at: sha256 -> (size, mtime)
+        self.unindexed: Dict[str, Tuple[int, float]] = {}
+        self._dirty = 0
+        self._load()
+        self._scan_blobs()
+
+    # ---- persistence ----
+
+    def _load(self) -> None:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("entries", {})
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self) -> None:
+        with self.lock:
+            self._save_locked()
+
+    def _save_locked(self) -> None:
+        # Other processes share the store: keep the entries they added.
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                on_disk = json.load(f).get("entries", {})
+            for url, entry in on_disk.items():
+                if url not in self.entries and os.path.exists(self._blob_path(entry["blob"])):
+                    self.entries[url] = entry
+        except (OSError, ValueError):
+            pass
+
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": self.entries}, f, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+        self._dirty = 0
+
+    def _scan_blobs(self) -> None:
+        """Find blobs without an index entry; drop stale ones and temp files."""
+        indexed = {entry["blob"] for entry in self.entries.values()}
+        blobs_dir = os.path.join(self.root, "blobs")
+        now = time.time()
+        try:
+            shards = [e.path for e in os.scandir(blobs_dir) if e.is_dir()]
+        except OSError:
+            return
+        for shard in shards:
+            try:
+                files = list(os.scandir(shard))
+            except OSError:
+                continue
+            for blob in files:
+                try:
+                    info = blob.stat()
+                except OSError:
+                    continue
+                if blob.name in indexed:
+                    continue
+                if now - info.st_mtime > ORPHAN_GRACE_SECONDS:
+                    try:
+                        os.remove(blob.path)
+                    except OSError:
+                        pass
+                    continue
+                if blob.name.endswith(".tmp"):
+                    continue  # Still being written by another process
+                self.unindexed[blob.name] = (info.st_size, info.st_mtime)
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], digest)
+
+    # ---- lookups ----
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the entry for ``url`` with its blob path, or None on a miss."""
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry is None:
+                return None
+            path = self._blob_path(entry["blob"])
+            if not os.path.exists(path):
+                # Evicted by another process; forget it.
+                del self.entries[url]
+                self._dirty += 1
+                return None
+            entry["last_used"] = time.time()
+            return {**entry, "path": path}
+
+    def store(self, url: str, body: bytes, headers: Dict[str, str]) -> None:
+        """Store ``body`` under its SHA-256 and point ``url`` at it."""
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+
+        with self.lock:
+            self.unindexed.pop(digest, None)
+            self.entries[url] = {
+                "blob": digest,
+                "headers": {k: v for k, v in headers.items() if k in KEPT_HEADERS},
+                "size": len(body),
+                "last_used": time.time(),
+            }
+            self._dirty += 1
+            self._evict_locked()
+            if self._dirty >= SAVE_EVERY:
+                self._save_locked()
+
+    def _evict_locked(self) -> None:
+        """Drop least-recently-used blobs until the store fits ``max_bytes``."""
+        blobs: Dict[str, Dict[str, Any]] = {}
+        for url, entry in self.entries.items():
+            blob = blobs.setdefault(
+                entry["blob"], {"size": entry["size"], "last_used": 0.0, "urls": []})
+            blob["last_used"] = max(blob["last_used"], entry["last_used"])
+            blob["urls"].append(url)
+        for digest, (size, mtime) in self.unindexed.items():
+            if digest not in blobs:
+                blobs[digest] = {"size": size, "last_used": mtime, "urls": []}
+
+        total = sum(b["size"] for b in blobs.values())
+        if total <= self.max_bytes:
+            return
+
+        for digest, blob in sorted(blobs.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            for url in blob["urls"]:
+                del self.entries[url]
+            self.unindexed.pop(digest, None)
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+            total -= blob["size"]
+            self._dirty += 1
+
+
+class AssetCacheStats:
+    """Per-context hit/miss counters for the shared asset store."""
+
+    def __init__(self, label: str) -> None:
+        self.label = label
+        self.hits = 0
+        self.misses = 0
+        self.bytes_served = 0
+        self.bytes_fetched = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"📦 Asset cache ({self.label}): {self.hit_rate:.0%} hit rate "
+            f"({self.hits} hits, {self.misses} misses, "
+            f"{self.bytes_served / 1_048_576:.1f} MB served locally, "
+            f"{self.bytes_fetched / 1_048_576:.1f} MB fetched)")
+
+
+def get_asset_store() -> AssetStore:
+    """Return the process-wide asset store, creating it on first use."""
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = AssetStore()
+        return _STORE
+
+
+def _make_handler(store: AssetStore, stats: AssetCacheStats):
+    def handle(route: Route, request: Request) -> None:
+        url = request.url
+        if request.method != "GET" or not is_immutable_asset(url):
+            route.fallback()
+            return
+
+        entry = store.lookup(url)
+        if entry is not None:
+            try:
+                route.fulfill(status=200, headers=entry["headers"], path=entry["path"])
+                stats.hits += 1
+                stats.bytes_served += entry["size"]
+                return
+            except OSError:
+                pass  # Blob vanished between lookup and read; fetch it again
+
+        stats.misses += 1
+        try:
+            response = route.fetch()
+        except Exception:
+            route.fallback()
+            return
+
+        body = response.body()
+        stats.bytes_fetched += len(body)
+        if _is_cacheable_response(response.status, response.headers):
+            try:
+                store.store(url, body, response.headers)
+            except OSError:
+                pass  # A full or read-only disk must not break the page
+        route.fulfill(response=response)
+
+    return handle
+
+
+def attach_asset_cache(context: BrowserContext, label: str) -> AssetCacheStats:
+    """Serve immutable static assets for ``context`` from the shared store."""
+    store = get_asset_store()
+    stats = AssetCacheStats(label)
+    context.route(STATIC_HOST_PATTERN, _make_handler(store, stats))
+    _ATTACHED[id(context)] = stats
+    return stats
+
+
+def detach_asset_cache(context: BrowserContext, show_stats: bool = True) -> Optional[AssetCacheStats]:
+    """Forget ``context``, persist the index and report its hit rate."""
+    stats = _ATTACHED.pop(id(context), None)
+    if stats is None:
+        return None
+    get_asset_store().save()
+    if show_stats and (stats.hits or stats.misses):
+        print(stats.summary())
+    return stats
@@ -0,0 +1,137 @@
+"""
+A launched platform profile with its feed page loaded and login verified.
+
+Each service splits posting into ``open_<platform>()``, which returns a
+BrowserSession (or None when the profile is not logged in), and
+``publish_to_<platform>(session, ...)``. This lets the CLI warm a session up
+while the user is still typing, or keep one alive across several posts.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import List, Optional, Union
+from urllib.parse import urlparse
+from playwright.sync_api import BrowserContext, Locator, Page, Playwright
+from valid_social_cli.utils.stealth_browser import close_playwright
+from valid_social_cli.utils.flight_recorder import (
+    FlightRecorder,
+    NullFlightRecorder,
+    get_flight_recorder,
+)
+from valid_social_cli.utils.deadline import Deadline
+from valid_social_cli.utils.har_harness import record_idle, record_step
+from valid_social_cli.utils.media_transfer import resolve_media
+from valid_social_cli.utils.upload_scheduler import (
+    UploadMeter,
+    UploadTicket,
+    acquire_upload_slot,
+    record_throughput,
+)
+
+DEFAULT_PLAYWRIGHT_TIMEOUT_MS = 30000
+
+
+class BrowserSession:
+    """Playwright driver, persistent context and feed page for one platform."""
+
+    def __init__(
+        self,
+        playwright: Playwright,
+        context: BrowserContext,
+        page: Page,
+        home_url: str,
+        deadline: Optional[Deadline] = None,
+    ) -> None:
+        self.playwright = playwright
+        self.context = context
+        self.page = page
+        self.home_url = home_url
+        self.deadline = deadline or Deadline()
+        self.recorder: Union[FlightRecorder, NullFlightRecorder] = get_flight_recorder(
+            context)
+        self.upload: Optional[UploadTicket] = None
+        self.upload_meter: Optional[UploadMeter] = None
+        self.last_step: Optional[str] = None
+        self.closed = False
+
+    def step(self, action: str, phase: Optional[str] = None) -> None:
+        """
+        Mark the start of ``action``. Records it in the flight recorder and,
+        for a deadline phase, applies the time left for that phase as the
+        context's default timeout. Raises DeadlineExceeded when out of time.
+        """
+        self.last_step = action
+        self.recorder.mark(action)
+        record_step(self.context, action)
+        if phase is not None:
+            self.deadline.start_phase(phase, self.context)
+        else:
+            self.deadline.check(action)
+
+    def human_delay(self, min_sec: float = 0.8, max_sec: float = 2.2) -> None:
+        """Wait a random short time to mimic human behavior, within the deadline."""
+        seconds = random.uniform(min_sec, max_sec)
+        record_idle(self.context, seconds)
+        self.deadline.sleep(seconds)
+
+    def type_slowly(self, field: Locator, text: str, min_ms: float, max_ms: float) -> None:
+        """Type ``text`` one key at a time with a random delay per key."""
+        for char in text:
+            self.deadline.check("type caption")
+            delay = random.uniform(min_ms, max_ms)
+            record_idle(self.context, delay / 1000)
+            field.type(char, delay=delay)
+
+    def capture_failure(self, error: BaseException) -> None:
+        """Save a flight recorder bundle for the step in progress, e.g. when it is cancelled."""
+        if not self.closed and not self.page.is_closed():
+            self.recorder.capture_failure(self.page, self.last_step or "open", error)
+
+    def reset_deadline(self, deadline: Optional[Deadline] = None) -> None:
+        """
+        Start a new budget for the next attempt on this session. Playwright's
+        default timeouts are restored when the new budget is unlimited.
+        """
+        self.deadline = deadline or Deadline()
+        if self.deadline.unlimited:
+            self.context.set_default_timeout(DEFAULT_PLAYWRIGHT_TIMEOUT_MS)
+            self.context.set_default_navigation_timeout(
+                DEFAULT_PLAYWRIGHT_TIMEOUT_MS)
+
+    def admit_upload(self, media: Union[str, List[str]]) -> None:
+        """
+        Wait for an upload slot for ``media``, then start timing the transfer.
+        Call right before handing the files to the browser, and
+        finish_upload() once the post is published.
+        """
+        self.release_upload()
+        num_bytes = sum(f.size for f in resolve_media(media))
+        host = urlparse(self.home_url).hostname or self.home_url
+        self.upload = acquire_upload_slot(host, num_bytes, self.deadline)
+        self.upload_meter = UploadMeter(self.context)
+
+    def finish_upload(self) -> None:
+        """The post was published: record the measured throughput and free the slot."""
+        if self.upload_meter is not None:
+            sample = self.upload_meter.stop()
+            if sample is not None:
+                record_throughput(*sample)
+        self.release_upload()
+
+    def release_upload(self) -> None:
+        """Free the upload slot without recording throughput."""
+        if self.upload_meter is not None:
+            self.upload_meter.stop()
+            self.upload_meter = None
+        if self.upload is not None:
+            self.upload.release()
+            self.upload = None
+
+    def close(self, show_errors: bool = True) -> None:
+        """Close the context and stop Playwright. Safe to call twice."""
+        if self.closed:
+            return
+        self.closed = True
+        self.release_upload()
+        close_playwright(self.playwright, self.context, show_errors)
@@ -0,0 +1,125 @@
+"""
+End-to-end deadline budgets for a posting attempt.
+
+A Deadline bounds a whole attempt (launch, feed navigation, composer, upload
+and publish). At each phase boundary the time that is left is split across
+the remaining phases by weight, and the phase's share becomes Playwright's
+default timeout for the context, so no single locator action can outlive
+the budget. Unused time rolls over to later phases automatically.
+
+Cancellation is cooperative: ``check()``, ``sleep()`` and ``start_phase()``
+raise DeadlineExceeded once the budget is spent. Like asyncio's
+CancelledError it derives from BaseException, so the services' per-step
+``except Exception`` fallbacks cannot swallow it; the attempt unwinds and
+the context is closed by the caller's ``finally``.
+
+Usage:
+    deadline = Deadline(90)
+    session = open_x(deadline)
+    session.step("open post dialog", "composer")
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, Optional
+from playwright.sync_api import BrowserContext
+
+# Relative share of the budget for each phase, in execution order.
+PHASE_WEIGHTS: Dict[str, float] = {
+    "launch": 15,
+    "navigation": 20,
+    "composer": 20,
+    "upload": 30,
+    "publish": 15,
+}
+
+
+class DeadlineExceeded(BaseException):
+    """Raised when an attempt runs out of its time budget."""
+
+
+class Deadline:
+    """Time budget for one posting attempt. ``seconds=None`` is unlimited."""
+
+    def __init__(self, seconds: Optional[float] = None, parent: Optional["Deadline"] = None) -> None:
+        self.seconds = seconds
+        self.expires_at: Optional[float] = None
+        if seconds is not None:
+            self.expires_at = time.monotonic() + seconds
+        if parent is not None and parent.expires_at is not None:
+            # A per-platform budget never outlives the per-post budget.
+            if self.expires_at is None or parent.expires_at < self.expires_at:
+                self.expires_at = parent.expires_at
+        self.phase: Optional[str] = None
+        self.phase_ends_at: Optional[float] = None
+
+    @property
+    def unlimited(self) -> bool:
+        return self.expires_at is None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None when unlimited."""
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def check(self, what: str = "") -> None:
+        """Raise DeadlineExceeded if the budget is spent."""
+        if self.expires_at is not None and time.monotonic() >= self.expires_at:
+            suffix = f" during {what}" if what else ""
+            raise DeadlineExceeded(
+                f"deadline of {self.seconds:.0f}s exceeded{suffix}"
+                if self.seconds is not None else f"deadline exceeded{suffix}")
+
+    def start_phase(self, phase: str, context: Optional[BrowserContext] = None) -> Optional[float]:
+        """
+        Enter ``phase`` and return its budget in seconds (None if unlimited).
+
+        A new phase gets its weighted share of the time that is left; a
+        repeated phase keeps the end time it was given. The budget is applied
+        as the context's default action and navigation timeout.
+        """
+        self.check(phase)
+        if self.expires_at is None:
+            return None
+
+        now = time.monotonic()
+        if phase != self.phase or self.phase_ends_at is None:
+            names = list(PHASE_WEIGHTS)
+            later = names[names.index(phase):] if phase in PHASE_WEIGHTS else [phase]
+            total_weight = sum(PHASE_WEIGHTS.get(p, 1) for p in later)
+            share = PHASE_WEIGHTS.get(phase, 1) / total_weight
+            self.phase = phase
+            self.phase_ends_at = now + (self.expires_at - now) * share
+
+        budget = max(min(self.phase_ends_at, self.expires_at) - now, 0.001)
+        if context is not None:
+            context.set_default_timeout(budget * 1000)
+            context.set_default_navigation_timeout(budget * 1000)
+        return budget
+
+    def raise_for_timeout(self, what: str, exc: BaseException) -> None:
+        """
+        Turn a Playwright timeout into DeadlineExceeded when the budget set it.
+
+        Phase shares are applied as Playwright timeouts, so a step can time out
+        before the whole budget is spent. Without a budget this does nothing
+        and the caller re-raises the original error.
+        """
+        if self.expires_at is not None:
+            raise DeadlineExceeded(
+                f"{what} ran out of its share of the deadline") from exc
+
+    def timeout_ms(self, phase: str) -> Optional[float]:
+        """Milliseconds ``phase`` may take if it started now (None if unlimited)."""
+        budget = self.start_phase(phase)
+        return None if budget is None else budget * 1000
+
+    def sleep(self, seconds: float) -> None:
+        """Sleep, but never past the deadline; raise once it is reached."""
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        time.sleep(seconds)
+        self.check()
@@ -0,0 +1,43 @@
+"""
+On/off switches that can come from a CLI flag or an environment variable.
+
+An explicit flag (``--x/--no-x``) always wins. Otherwise the environment
+variable is read: "1", "true", "yes" and "on" switch the feature on, "0",
+"false", "no" and "off" switch it off, and anything else (or an unset
+variable) leaves the default.
+
+Usage:
+    if env_flag("VALID_SOCIAL_FLIGHT_RECORDER", flight_recorder):
+        ...
+    headless = env_flag("VALID_SOCIAL_HEADLESS", headless, default=True)
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+TRUE_VALUES = ("1", "true", "yes", "on")
+FALSE_VALUES = ("0", "false", "no", "off")
+
+
+def env_flag(name: str, flag: Optional[bool] = None, default: bool = False) -> bool:
+    """
+    Resolve an on/off switch from an explicit flag or the environment.
+
+    Args:
+        name: Environment variable consulted when ``flag`` is None.
+        flag: Explicit value from the command line, if any.
+        default: Value when neither the flag nor the variable decides.
+
+    Returns:
+        Whether the switch is on.
+    """
+    if flag is not None:
+        return flag
+    value = os.getenv(name, "").strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    return default
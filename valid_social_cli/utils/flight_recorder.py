@@ -0,0 +1,393 @@
+"""
+Opt-in flight recorder for Playwright browser contexts.
+
+While a post is running the recorder keeps a bounded, in-memory ring
+buffer of recent actions, console errors and network activity, plus a
+Playwright trace of the step in progress. The trace is recorded without DOM
+snapshots: with snapshots on, Playwright also saves every network resource
+to its trace directory for as long as the context lives, which grows without
+bound in ``watch``. Without them it only logs the actions, a few KB per step.
+When a step fails, a bundle is written with:
+
+    trace.zip        Playwright trace (actions only) of the failing step
+    screenshot.png   Full-page screenshot at the time of failure
+    network.har      HAR built from the recent network ring buffer
+    dom.html         DOM snapshot of the page at the time of failure
+    events.json      Recent actions, console errors and network failures
+
+Bundles are rotated so the recorder directory never grows past
+``max_bundles`` entries or ``max_bytes`` in total.
+
+Usage:
+    playwright, context = launch_stealth_browser(flight_recorder=True)
+    recorder = get_flight_recorder(context)
+    recorder.mark("open post dialog")
+    ...
+    recorder.capture_failure(page, "open post dialog")
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Union
+from playwright.sync_api import BrowserContext, ConsoleMessage, Page, Request, Response
+from valid_social_cli.utils.env_flags import env_flag
+
+FLIGHT_RECORDER_DIR: str = os.path.join("storage", "flight_recorder")
+FLIGHT_RECORDER_ENV: str = "VALID_SOCIAL_FLIGHT_RECORDER"
+
+DEFAULT_MAX_EVENTS: int = 200
+DEFAULT_MAX_NETWORK_ENTRIES: int = 100
+DEFAULT_MAX_BUNDLES: int = 20
+DEFAULT_MAX_BYTES: int = 200 * 1024 * 1024  # 200 MB across all bundles
+
+# Contexts with an attached recorder, keyed by id(context).
+_RECORDERS: Dict[int, "FlightRecorder"] = {}
+
+
+def flight_recorder_enabled(flag: Optional[bool] = None) -> bool:
+    """
+    Resolve whether the flight recorder should run.
+
+    An explicit flag wins; otherwise the VALID_SOCIAL_FLIGHT_RECORDER
+    environment variable is consulted (see env_flag).
+    """
+    return env_flag(FLIGHT_RECORDER_ENV, flag)
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "step"
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class NullFlightRecorder:
+    """Recorder used when recording is disabled. Every call is a no-op."""
+
+    enabled: bool = False
+
+    def mark(self, action: str, **details: Any) -> None:
+        pass
+
+    def capture_failure(
+        self,
+        page: Optional[Page],
+        step: str,
+        error: Optional[BaseException] = None,
+    ) -> Optional[str]:
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+class FlightRecorder:
+    """
+    Bounded recorder of recent browser activity for a single context.
+    """
+
+    enabled: bool = True
+
+    def __init__(
+        self,
+        context: BrowserContext,
+        label: str,
+        output_dir: str = FLIGHT_RECORDER_DIR,
+        max_events: int = DEFAULT_MAX_EVENTS,
+        max_network_entries: int = DEFAULT_MAX_NETWORK_ENTRIES,
+        max_bundles: int = DEFAULT_MAX_BUNDLES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.context = context
+        self.label = label
+        self.output_dir = output_dir
+        self.max_bundles = max_bundles
+        self.max_bytes = max_bytes
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self.network: Deque[Dict[str, Any]] = deque(maxlen=max_network_entries)
+        # Entries whose response arrived but whose body is still loading;
+        # their timing is only complete once the request finishes.
+        self._unfinished: Dict[Request, Dict[str, Any]] = {}
+        self._max_unfinished = max_network_entries
+        self._tracing = False
+
+    # ---- lifecycle ----
+
+    def attach(self) -> None:
+        """Start listening to the context and begin a trace chunk."""
+        for page in self.context.pages:
+            self._watch_page(page)
+        self.context.on("page", self._watch_page)
+
+        try:
+            # No snapshots or screenshots: the failure bundle has its own
+            # screenshot and dom.html, and snapshots would keep every network
+            # resource on disk until the context closes.
+            self.context.tracing.start(
+                snapshots=False, screenshots=False, sources=False)
+            self.context.tracing.start_chunk(title=self.label)
+            self._tracing = True
+        except Exception:
+            print("⚠️ Flight recorder could not start tracing. Continuing without trace.")
+
+    def close(self) -> None:
+        """Stop tracing and discard anything that was not captured."""
+        if self._tracing:
+            try:
+                self.context.tracing.stop_chunk()
+                self.context.tracing.stop()
+            except Exception:
+                pass
+            self._tracing = False
+        self.events.clear()
+        self.network.clear()
+        self._unfinished.clear()
+
+    # ---- event collection ----
+
+    def _watch_page(self, page: Page) -> None:
+        page.on("console", self._on_console)
+        page.on("pageerror", self._on_page_error)
+        page.on("response", self._on_response)
+        page.on("requestfinished", self._on_request_finished)
+        page.on("requestfailed", self._on_request_failed)
+
+    def _record(self, kind: str, **data: Any) -> None:
+        self.events.append({"time": _now_iso(), "kind": kind, **data})
+
+    def _on_console(self, message: ConsoleMessage) -> None:
+        if message.type in ("error", "warning"):
+            self._record("console", level=message.type, text=message.text)
+
+    def _on_page_error(self, error: Any) -> None:
+        self._record("pageerror", text=str(error))
+
+    def _on_response(self, response: Response) -> None:
+        request = response.request
+        self.network.append({
+            "time": _now_iso(),
+            "method": request.method,
+            "url": request.url,
+            "request_headers": request.headers,
+            "status": response.status,
+            "status_text": response.status_text,
+            "response_headers": response.headers,
+            "timing": None,
+        })
+        self._unfinished[request] = self.network[-1]
+        if len(self._unfinished) > self._max_unfinished:
+            # Long-lived requests (streams) never finish; forget the oldest
+            self._unfinished.pop(next(iter(self._unfinished)))
+
+    def _on_request_finished(self, request: Request) -> None:
+        entry = self._unfinished.pop(request, None)
+        if entry is not None:
+            entry["timing"] = request.timing
+
+    def _on_request_failed(self, request: Request) -> None:
+        self._unfinished.pop(request, None)
+        failure = request.failure or "unknown error"
+        self._record("requestfailed", method=request.method,
+                     url=request.url, failure=failure)
+        self.network.append({
+            "time": _now_iso(),
+            "method": request.method,
+            "url": request.url,
+            "request_headers": request.headers,
+            "status": 0,
+            "status_text": failure,
+            "response_headers": {},
+            "timing": request.timing,
+        })
+
+    def mark(self, action: str, **details: Any) -> None:
+        """
+        Record the start of an action. The trace chunk is rotated so the
+        trace only ever covers the step currently in progress.
+        """
+        self._record("action", action=action, **details)
+        if self._tracing:
+            try:
+                self.context.tracing.stop_chunk()
+                self.context.tracing.start_chunk(title=action)
+            except Exception:
+                self._tracing = False
+
+    # ---- failure capture ----
+
+    def capture_failure(
+        self,
+        page: Optional[Page],
+        step: str,
+        error: Optional[BaseException] = None,
+    ) -> Optional[str]:
+        """
+        Write a failure bundle for ``step`` and return its directory.
+        Never raises: a broken recorder must not mask the original failure.
+        """
+        try:
+            return self._write_bundle(page, step, error)
+        except Exception:
+            print("⚠️ Flight recorder failed to write its bundle:")
+            traceback.print_exc()
+            return None
+
+    def _write_bundle(
+        self,
+        page: Optional[Page],
+        step: str,
+        error: Optional[BaseException],
+    ) -> str:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        bundle_dir = os.path.join(
+            self.output_dir, f"{_slugify(self.label)}-{stamp}-{_slugify(step)}")
+        os.makedirs(bundle_dir, exist_ok=True)
+
+        self._record("failure", step=step,
+                     error=repr(error) if error is not None else None)
+
+        if self._tracing:
+            try:
+                self.context.tracing.stop_chunk(
+                    path=os.path.join(bundle_dir, "trace.zip"))
+                self.context.tracing.start_chunk(title=f"after {step}")
+            except Exception:
+                self._tracing = False
+
+        if page is not None and not page.is_closed():
+            try:
+                page.screenshot(path=os.path.join(
+                    bundle_dir, "screenshot.png"), full_page=True, timeout=10000)
+            except Exception:
+                pass
+            try:
+                with open(os.path.join(bundle_dir, "dom.html"), "w", encoding="utf-8") as f:
+                    f.write(page.content())
+            except Exception:
+                pass
+
+        with open(os.path.join(bundle_dir, "network.har"), "w", encoding="utf-8") as f:
+            json.dump(self._build_har(), f, indent=2)
+
+        with open(os.path.join(bundle_dir, "events.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "label": self.label,
+                "step": step,
+                "url": page.url if page is not None and not page.is_closed() else None,
+                "events": list(self.events),
+            }, f, indent=2, default=str)
+
+        print(f"🛩️ Flight recorder saved failure bundle: {bundle_dir}")
+        self._rotate()
+        return bundle_dir
+
+    def _build_har(self) -> Dict[str, Any]:
+        def header_list(headers: Dict[str, str]) -> List[Dict[str, str]]:
+            return [{"name": k, "value": v} for k, v in headers.items()]
+
+        entries: List[Dict[str, Any]] = []
+        for item in self.network:
+            timing = item.get("timing") or {}
+            total = max(float(timing.get("responseEnd", -1)), 0.0)
+            entries.append({
+                "startedDateTime": item["time"],
+                "time": total,
+                "request": {
+                    "method": item["method"],
+                    "url": item["url"],
+                    "httpVersion": "HTTP/1.1",
+                    "headers": header_list(item["request_headers"]),
+                    "queryString": [],
+                    "cookies": [],
+                    "headersSize": -1,
+                    "bodySize": -1,
+                },
+                "response": {
+                    "status": item["status"],
+                    "statusText": item["status_text"],
+                    "httpVersion": "HTTP/1.1",
+                    "headers": header_list(item["response_headers"]),
+                    "cookies": [],
+                    "content": {"size": -1, "mimeType": item["response_headers"].get("content-type", "")},
+                    "redirectURL": "",
+                    "headersSize": -1,
+                    "bodySize": -1,
+                },
+                "cache": {},
+                "timings": {"send": 0, "wait": total, "receive": 0},
+            })
+        return {
+            "log": {
+                "version": "1.2",
+                "creator": {"name": "valid-social flight recorder", "version": "1"},
+                "pages": [],
+                "entries": entries,
+            }
+        }
+
+    def _rotate(self) -> None:
+        """Drop the oldest bundles until the count and size caps are met."""
+        try:
+            bundles = [
+                os.path.join(self.output_dir, name)
+                for name in os.listdir(self.output_dir)
+                if os.path.isdir(os.path.join(self.output_dir, name))
+            ]
+        except OSError:
+            return
+
+        bundles.sort(key=os.path.getmtime)
+        sizes = {path: _dir_size(path) for path in bundles}
+        total = sum(sizes.values())
+
+        while bundles and (len(bundles) > self.max_bundles or total > self.max_bytes):
+            oldest = bundles.pop(0)
+            total -= sizes[oldest]
+            shutil.rmtree(oldest, ignore_errors=True)
+
+
+# ---- Registry helpers ----
+
+
+def attach_flight_recorder(
+    context: BrowserContext,
+    label: str,
+    **options: Any,
+) -> FlightRecorder:
+    """Create a recorder for ``context`` and register it."""
+    recorder = FlightRecorder(context, label, **options)
+    recorder.attach()
+    _RECORDERS[id(context)] = recorder
+    print(f"🛩️ Flight recorder armed for {label}.")
+    return recorder
+
+
+def get_flight_recorder(context: BrowserContext) -> Union[FlightRecorder, NullFlightRecorder]:
+    """Return the recorder attached to ``context``, or a no-op recorder."""
+    return _RECORDERS.get(id(context)) or NullFlightRecorder()
+
+
+def detach_flight_recorder(context: BrowserContext) -> None:
+    """Stop and forget the recorder attached to ``context``, if any."""
+    recorder = _RECORDERS.pop(id(context), None)
+    if recorder is not None:
+        recorder.close()
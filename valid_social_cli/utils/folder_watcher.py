@@ -0,0 +1,274 @@
+"""
+Watch a folder for new media and group finished files into posts.
+
+On Linux the folder is watched with inotify (through ctypes, no extra
+dependency); elsewhere, or if inotify is unavailable, it falls back to
+polling. Either way the watcher only says "something changed" and the
+MediaBatcher rescans the folder with ``os.scandir``.
+
+A file is considered finished once its size and mtime have not changed for
+``settle`` seconds, which debounces files that are still being copied.
+Files with the same stem form one post. A short ``_1`` / ``-02`` counter is
+only stripped when a file named after the base exists, so ``launch_1.jpg``,
+``launch_2.jpg`` and ``launch.txt`` become one post whose caption is read
+from the sidecar, while ``IMG_1234.jpg`` and ``IMG_1235.jpg`` stay separate.
+
+Media without a sidecar is held for ``caption_grace`` more seconds in case
+its caption is still being written. A caption that never gets media (or
+arrives after its media was posted) is dropped instead of being attached
+to a later post with the same name.
+
+Usage:
+    watcher = create_watcher("/srv/drop")
+    batcher = MediaBatcher("/srv/drop")
+    while True:
+        watcher.wait(batcher.next_timeout())
+        batcher.scan()
+        for group in batcher.pop_ready():
+            ...
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import platform
+import re
+import select
+import time
+from typing import Dict, List, Optional, Set, Tuple, Union
+from valid_social_cli.utils.media_index import is_media_file
+
+CAPTION_EXTENSIONS = (".txt", ".caption")
+DEFAULT_SETTLE_SECONDS = 3.0
+DEFAULT_CAPTION_GRACE_SECONDS = 10.0
+# A caption without media is dropped once it has been stable this long.
+STALE_CAPTION_SECONDS = 300.0
+DEFAULT_POLL_INTERVAL = 2.0
+
+# inotify flags (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_COUNTER_SUFFIX = re.compile(r"^(.+?)[ _-]\d{1,2}$")
+
+
+def file_stem(name: str) -> str:
+    return os.path.splitext(os.path.basename(name))[0].lower()
+
+
+def group_key(name: str, stems: Set[str]) -> str:
+    """
+    Group key for a file name: its lowercased stem, without a short trailing
+    counter if ``stems`` holds a file named after the base.
+
+    Args:
+        name: File name or path.
+        stems: Lowercased stems of the files currently in the folder.
+
+    Returns:
+        The key shared by every file of the same post.
+    """
+    stem = file_stem(name)
+    match = _COUNTER_SUFFIX.match(stem)
+    if match and match.group(1) in stems:
+        return match.group(1)
+    return stem
+
+
+def is_caption_file(name: str) -> bool:
+    return os.path.splitext(name)[1].lower() in CAPTION_EXTENSIONS
+
+
+class PollingWatcher:
+    """Fallback watcher: simply wakes up every ``interval`` seconds."""
+
+    def __init__(self, directory: str, interval: float = DEFAULT_POLL_INTERVAL) -> None:
+        self.directory = directory
+        self.interval = interval
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify watcher for a single directory."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(directory), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the folder changes or ``timeout`` expires."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+        # Drain the queue; the batcher rescans the folder anyway.
+        try:
+            while os.read(self._fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(
+    directory: str,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+) -> Union[InotifyWatcher, PollingWatcher]:
+    """Return an inotify watcher on Linux, or a polling watcher otherwise."""
+    if platform.system() == "Linux":
+        try:
+            watcher = InotifyWatcher(directory)
+            print("👀 Watching with inotify.")
+            return watcher
+        except (OSError, AttributeError):
+            print("ℹ️ inotify unavailable. Falling back to polling.")
+    else:
+        print(f"👀 Watching by polling every {poll_interval:.0f}s.")
+    return PollingWatcher(directory, poll_interval)
+
+
+class MediaGroup:
+    """Media files (and optional caption) that make up one post."""
+
+    def __init__(self, key: str, media: List[str], caption_path: Optional[str]) -> None:
+        self.key = key
+        self.media = media
+        self.caption_path = caption_path
+
+    def read_caption(self) -> Optional[str]:
+        if self.caption_path is None:
+            return None
+        try:
+            with open(self.caption_path, "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+
+class MediaBatcher:
+    """Tracks files in a folder until they settle, then groups them."""
+
+    def __init__(
+        self,
+        directory: str,
+        settle: float = DEFAULT_SETTLE_SECONDS,
+        include_existing: bool = False,
+        caption_grace: float = DEFAULT_CAPTION_GRACE_SECONDS,
+    ) -> None:
+        self.directory = directory
+        self.settle = settle
+        self.caption_grace = caption_grace
+        # path -> (size, mtime_ns, time of last change)
+        self.pending: Dict[str, Tuple[int, int, float]] = {}
+        self.seen: Set[str] = set()
+        # group key -> when it was last posted
+        self.posted: Dict[str, float] = {}
+        if not include_existing:
+            self.seen.update(path for path, _stat in self._list())
+
+    def _list(self) -> List[Tuple[str, os.stat_result]]:
+        found: List[Tuple[str, os.stat_result]] = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.startswith("."):
+                        continue
+                    if not (is_media_file(entry.name) or is_caption_file(entry.name)):
+                        continue
+                    try:
+                        if entry.is_file():
+                            found.append((entry.path, entry.stat()))
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return found
+
+    def scan(self) -> None:
+        """Pick up new files and note any that are still changing."""
+        now = time.monotonic()
+        for path, stat in self._list():
+            if path in self.seen:
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            previous = self.pending.get(path)
+            if previous is None or previous[:2] != signature:
+                self.pending[path] = (*signature, now)
+
+    def next_timeout(self) -> Optional[float]:
+        """How long the watcher may sleep (None: until the folder changes)."""
+        if not self.pending:
+            return None
+        return max(self.settle / 2, 0.1)
+
+    def _forget(self, paths: List[str]) -> None:
+        for p in paths:
+            del self.pending[p]
+            self.seen.add(p)
+
+    def pop_ready(self) -> List[MediaGroup]:
+        """
+        Return groups whose files have all been stable for ``settle`` seconds.
+
+        Groups without a caption wait ``caption_grace`` seconds longer.
+        Caption files on their own keep waiting for media, and are dropped
+        if their media was just posted or none turns up.
+        """
+        now = time.monotonic()
+        self.posted = {k: t for k, t in self.posted.items()
+                       if now - t < STALE_CAPTION_SECONDS}
+        stems = {file_stem(p) for p in self.pending}
+        groups: Dict[str, List[str]] = {}
+        for path in self.pending:
+            groups.setdefault(group_key(path, stems), []).append(path)
+
+        ready: List[MediaGroup] = []
+        for key, paths in groups.items():
+            quiet = min(now - self.pending[p][2] for p in paths)
+            if quiet < self.settle:
+                continue
+            media = sorted(p for p in paths if is_media_file(p))
+            captions = sorted(p for p in paths if is_caption_file(p))
+            if not media:
+                # launch.txt also belongs to launch_1.jpg posted on its own
+                if any(group_key(k, {key}) == key for k in self.posted):
+                    print(f"ℹ️ Ignoring late caption for '{key}': its media was already posted.")
+                    self._forget(paths)
+                elif quiet >= STALE_CAPTION_SECONDS:
+                    print(f"ℹ️ Ignoring caption for '{key}': no media arrived.")
+                    self._forget(paths)
+                continue
+            if not captions and quiet < self.settle + self.caption_grace:
+                continue
+            self._forget(paths)
+            self.posted[key] = now
+            ready.append(MediaGroup(key, media, captions[0] if captions else None))
+        return ready
@@ -1,5 +1,5 @@
 from typing import List, Optional
-from valid_social_cli.utils.file_selector import select_file
+from valid_social_cli.utils.terminal_picker import pick_media
 
 
 def get_media_files() -> Optional[List[str]]:
@@ -12,16 +12,11 @@ def get_media_files() -> Optional[List[str]]:
         return None
 
     print("\n📸 Preparing upload...")
-    media_files = select_file(
-        title="Select media for upload", multiple=True)
+    media_files = pick_media()
 
     if not media_files:
         print("⚠️ No media selected. Proceeding without uploads.")
         return None
 
-    # Normalize to list
-    if isinstance(media_files, str):
-        media_files = [media_files]
-
     print(f"✅ {len(media_files)} file(s) selected for upload.")
     return media_files
@@ -0,0 +1,527 @@
+"""
+Record a real posting session to a HAR bundle and replay it offline.
+
+Recording (``launch_stealth_browser(record_har=True)`` or
+VALID_SOCIAL_RECORD_HAR=1) has Playwright write every request of the
+context to a HAR archive. When the context closes the archive is scrubbed:
+cookies, auth headers, CSRF tokens and password/token fields are replaced
+with ``REDACTED``, and so is every other occurrence of those values in
+URLs and text bodies. Recorded hosts and paths are left as they are (the
+scrub refuses to write a bundle that would change them), so replay still
+matches every request. Each bundle is written to
+``storage/har/<profile>/<stamp>/``:
+
+    session.har.zip   scrubbed HAR (Playwright "attach" zip)
+    steps.json        when each service step started and how long it took
+
+Replay (``launch_stealth_browser(replay_har="latest")``) opens a throwaway
+profile and serves the recorded flow with ``route_from_har`` and
+``not_found="abort"``, so no request reaches the network. The platform's
+publish requests are stubbed with their recorded responses whatever the
+request body, so the run never posts anything and the flow still completes.
+The replay's step timings are saved next to the recording's and compared
+with them. Deliberate human-like pauses and per-key typing delays are random,
+so each step records them as ``idle`` and only the remaining active time is
+compared.
+
+Usage:
+    playwright, context = launch_stealth_browser(profile, record_har=True)
+    ...                                  # run a real post
+    playwright, context = launch_stealth_browser(profile, replay_har="latest")
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Pattern, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from playwright.sync_api import BrowserContext, Route
+from valid_social_cli.utils.env_flags import env_flag
+
+HAR_DIR: str = os.path.join("storage", "har")
+RECORD_HAR_ENV: str = "VALID_SOCIAL_RECORD_HAR"
+HAR_FILE_NAME = "session.har.zip"
+STEPS_FILE_NAME = "steps.json"
+# Name of the HAR document inside a Playwright HAR zip.
+HAR_ENTRY_NAME = "har.har"
+REDACTED = "REDACTED"
+
+SECRET_HEADERS = {
+    "cookie", "set-cookie", "authorization", "proxy-authorization",
+    "x-csrf-token", "x-ig-www-claim", "x-guest-token", "x-fb-lsd",
+}
+# Field names (headers, query, form and JSON keys) holding secrets. Anchored,
+# so e.g. the HTTP/2 ":authority" header or "author_id" never match.
+SECRET_FIELD_PATTERN: Pattern[str] = re.compile(
+    r"^(?:[a-z0-9]+[_-])*(?:pass|passwd|password|token|secret|csrf|csrftoken"
+    r"|sessionid|session_id|fb_dtsg|lsd|jazoest)$", re.I)
+# Values shorter than this are not replaced elsewhere in the HAR.
+MIN_SECRET_LENGTH = 8
+
+# Requests that create the post, stubbed on replay. Keyed by profile label.
+PUBLISH_REQUESTS: Dict[str, List[Tuple[str, Optional[str]]]] = {
+    # (URL regex, substring the POST body must contain)
+    "x_profile": [
+        (r"/i/api/graphql/[^/]+/CreateTweet", None),
+        (r"^https://upload\.(twitter|x)\.com/", None),
+    ],
+    "instagram_profile": [
+        (r"/api/v1/media/configure", None),
+        (r"/rupload_ig(photo|video)/", None),
+    ],
+    "facebook_profile": [
+        (r"/api/graphql/", "ComposerStoryCreateMutation"),
+        (r"^https://upload\.facebook\.com/", None),
+    ],
+}
+
+
+
+class ReplayNotFound(FileNotFoundError):
+    """Raised when there is no recording to replay for a profile."""
+
+
+# Step timings collected per context, keyed by id(context).
+_SESSIONS: Dict[int, "HarSession"] = {}
+
+
+def record_har_enabled(flag: Optional[bool] = None) -> bool:
+    """
+    Resolve whether the session should be recorded to a HAR bundle.
+
+    An explicit flag wins; otherwise the VALID_SOCIAL_RECORD_HAR environment
+    variable is consulted (see env_flag).
+    """
+    return env_flag(RECORD_HAR_ENV, flag)
+
+
+# ---- Bundles ----
+
+
+def new_bundle_dir(label: str, prefix: str = "") -> str:
+    """Create ``storage/har/<label>/<prefix><stamp>/`` and return it."""
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(HAR_DIR, label, f"{prefix}{stamp}")
+    suffix = 1
+    while os.path.exists(path):
+        suffix += 1
+        path = os.path.join(HAR_DIR, label, f"{prefix}{stamp}-{suffix}")
+    os.makedirs(path)
+    return path
+
+
+def latest_recording(label: str) -> Optional[str]:
+    """Newest recorded bundle for ``label`` (replays are skipped), or None."""
+    root = os.path.join(HAR_DIR, label)
+    try:
+        names = sorted(os.listdir(root), reverse=True)
+    except OSError:
+        return None
+    for name in names:
+        bundle = os.path.join(root, name)
+        if not name.startswith("replay-") and os.path.isfile(os.path.join(bundle, HAR_FILE_NAME)):
+            return bundle
+    return None
+
+
+def resolve_replay_bundle(spec: str, label: str) -> str:
+    """
+    Find the recording to replay for profile ``label``.
+
+    Args:
+        spec: "latest", a bundle directory, a HAR zip, or a directory holding
+            one folder of bundles per profile (e.g. storage/har).
+        label: Profile label, e.g. "x_profile".
+
+    Returns:
+        The bundle directory.
+
+    Raises:
+        ReplayNotFound: If no recording matches.
+    """
+    if spec == "latest":
+        bundle = latest_recording(label)
+    elif os.path.isfile(spec):
+        bundle = os.path.dirname(os.path.abspath(spec))
+    elif os.path.isfile(os.path.join(spec, HAR_FILE_NAME)):
+        bundle = spec
+    else:
+        bundle = None
+        root = os.path.join(spec, label)
+        if os.path.isdir(root):
+            names = sorted(n for n in os.listdir(root) if not n.startswith("replay-"))
+            if names:
+                bundle = os.path.join(root, names[-1])
+    if bundle is None or not os.path.isfile(os.path.join(bundle, HAR_FILE_NAME)):
+        raise ReplayNotFound(f"No HAR recording for {label} in {spec}")
+    return bundle
+
+
+# ---- Scrubbing ----
+
+
+def _redact_pairs(pairs: List[Dict[str, Any]], secrets: Set[str], names_only: bool = False) -> None:
+    """Redact HAR name/value pairs whose name looks secret."""
+    for pair in pairs:
+        name = str(pair.get("name", ""))
+        if name.startswith(":"):
+            continue  # HTTP/2 pseudo-header (:authority, :path, ...)
+        if names_only or name.lower() in SECRET_HEADERS or SECRET_FIELD_PATTERN.search(name):
+            value = str(pair.get("value", ""))
+            if len(value) >= MIN_SECRET_LENGTH:
+                secrets.add(value)
+            pair["value"] = REDACTED
+
+
+def _redact_json(value: Any, secrets: Set[str]) -> Any:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if SECRET_FIELD_PATTERN.search(str(key)) and isinstance(item, (str, int)):
+                if len(str(item)) >= MIN_SECRET_LENGTH:
+                    secrets.add(str(item))
+                value[key] = REDACTED
+            else:
+                value[key] = _redact_json(item, secrets)
+    elif isinstance(value, list):
+        return [_redact_json(item, secrets) for item in value]
+    return value
+
+
+def _redact_url(url: str, secrets: Set[str]) -> str:
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    query = []
+    changed = False
+    for name, value in parse_qsl(parts.query, keep_blank_values=True):
+        if SECRET_FIELD_PATTERN.search(name):
+            if len(value) >= MIN_SECRET_LENGTH:
+                secrets.add(value)
+            value = REDACTED
+            changed = True
+        query.append((name, value))
+    # Leave untouched URLs byte-identical so replay still matches them
+    if not changed:
+        return url
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _redact_post_data(post_data: Dict[str, Any], secrets: Set[str]) -> None:
+    _redact_pairs(post_data.get("params") or [], secrets)
+    text = post_data.get("text")
+    if not text:
+        return
+    mime = post_data.get("mimeType", "")
+    if "json" in mime:
+        try:
+            redacted = _redact_json(json.loads(text), secrets)
+            if redacted != json.loads(text):
+                post_data["text"] = json.dumps(redacted)
+        except ValueError:
+            pass
+    elif "x-www-form-urlencoded" in mime:
+        fields = []
+        changed = False
+        for name, value in parse_qsl(text, keep_blank_values=True):
+            if SECRET_FIELD_PATTERN.search(name):
+                if len(value) >= MIN_SECRET_LENGTH:
+                    secrets.add(value)
+                value = REDACTED
+                changed = True
+            fields.append((name, value))
+        if changed:
+            post_data["text"] = urlencode(fields)
+
+
+def scrub_har(har: Dict[str, Any]) -> Set[str]:
+    """
+    Redact secrets in a HAR document in place.
+
+    Returns:
+        The secret values found, so they can also be removed from bodies.
+    """
+    secrets: Set[str] = set()
+    hosts: Set[str] = set()
+    for entry in har.get("log", {}).get("entries", []):
+        hosts.add((urlsplit(entry.get("request", {}).get("url", "")).hostname or "").lower())
+        for part in (entry.get("request", {}), entry.get("response", {})):
+            _redact_pairs(part.get("headers") or [], secrets)
+            _redact_pairs(part.get("cookies") or [], secrets, names_only=True)
+        request = entry.get("request", {})
+        request["url"] = _redact_url(request.get("url", ""), secrets)
+        _redact_pairs(request.get("queryString") or [], secrets)
+        if request.get("postData"):
+            _redact_post_data(request["postData"], secrets)
+    # Replacing a value found in a host name would break every URL on it
+    return {s for s in secrets if not any(s.lower() in host for host in hosts)}
+
+
+def _origins(har: Dict[str, Any]) -> List[str]:
+    origins = []
+    for entry in har.get("log", {}).get("entries", []):
+        parts = urlsplit(entry.get("request", {}).get("url", ""))
+        origins.append(f"{parts.scheme}://{parts.netloc}{parts.path}")
+    return origins
+
+
+def _scrub_text(har: Dict[str, Any], pattern: Optional[Pattern[str]]) -> str:
+    """
+    Serialize a scrubbed HAR with every secret value replaced, checking that
+    the recorded URLs (scheme, host and path) came through unchanged so
+    route_from_har can still match them.
+    """
+    before = _origins(har)
+    text = json.dumps(har)
+    if pattern is None:
+        return text
+    text = pattern.sub(REDACTED, text)
+    changed = [a for a, b in zip(before, _origins(json.loads(text))) if a != b]
+    if changed:
+        raise ValueError(f"scrubbing would rewrite recorded URL {changed[0]}")
+    return text
+
+
+def _secret_pattern(secrets: Set[str]) -> Optional[Pattern[str]]:
+    if not secrets:
+        return None
+    ordered = sorted(secrets, key=len, reverse=True)
+    return re.compile("|".join(re.escape(s) for s in ordered))
+
+
+def scrub_har_file(path: str) -> int:
+    """
+    Scrub a HAR zip (or plain .har) in place, including text bodies.
+
+    Returns:
+        Number of distinct secret values removed.
+    """
+    if not zipfile.is_zipfile(path):
+        with open(path, "r", encoding="utf-8") as f:
+            har = json.load(f)
+        secrets = scrub_har(har)
+        text = _scrub_text(har, _secret_pattern(secrets))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return len(secrets)
+
+    with zipfile.ZipFile(path) as src:
+        har = json.loads(src.read(HAR_ENTRY_NAME))
+        secrets = scrub_har(har)
+        pattern = _secret_pattern(secrets)
+        text = _scrub_text(har, pattern)
+        tmp_path = path + ".tmp"
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as dst:
+            dst.writestr(HAR_ENTRY_NAME, text)
+            for info in src.infolist():
+                if info.filename == HAR_ENTRY_NAME:
+                    continue
+                data = src.read(info)
+                if pattern is not None:
+                    try:
+                        data = pattern.sub(REDACTED, data.decode("utf-8")).encode("utf-8")
+                    except UnicodeDecodeError:
+                        pass  # Binary body (image, video, font)
+                dst.writestr(info, data)
+    os.replace(tmp_path, path)
+    return len(secrets)
+
+
+# ---- Replay ----
+
+
+def _read_har(path: str) -> Tuple[Dict[str, Any], Optional[zipfile.ZipFile]]:
+    if zipfile.is_zipfile(path):
+        archive = zipfile.ZipFile(path)
+        return json.loads(archive.read(HAR_ENTRY_NAME)), archive
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f), None
+
+
+def _recorded_response(har_path: str, url_pattern: str, body_marker: Optional[str]) -> Optional[Dict[str, Any]]:
+    """The recorded response of the first request matching a publish pattern."""
+    har, archive = _read_har(har_path)
+    try:
+        for entry in har.get("log", {}).get("entries", []):
+            request = entry.get("request", {})
+            if not re.search(url_pattern, request.get("url", "")):
+                continue
+            if body_marker and body_marker not in (request.get("postData") or {}).get("text", ""):
+                continue
+            response = entry.get("response", {})
+            content = response.get("content", {})
+            body = b""
+            if content.get("_file") and archive is not None:
+                body = archive.read(content["_file"])
+            elif content.get("text"):
+                body = content["text"].encode("utf-8")
+            headers = {h["name"]: h["value"] for h in response.get("headers", [])
+                       if h["name"].lower() not in ("content-length", "content-encoding", "set-cookie")}
+            return {"status": response.get("status", 200), "headers": headers, "body": body}
+    finally:
+        if archive is not None:
+            archive.close()
+    return None
+
+
+def stub_publish_requests(context: BrowserContext, label: str, har_path: str) -> None:
+    """Answer the platform's publish requests from the recording, never the network."""
+    for url_pattern, body_marker in PUBLISH_REQUESTS.get(label, []):
+        recorded = _recorded_response(har_path, url_pattern, body_marker)
+
+        def handle(route: Route, marker: Optional[str] = body_marker,
+                   response: Optional[Dict[str, Any]] = recorded) -> None:
+            if marker and marker not in (route.request.post_data or ""):
+                route.fallback()
+                return
+            print(f"🧪 Stubbed publish request: {route.request.method} {route.request.url[:80]}")
+            if response is None:
+                route.fulfill(status=200, content_type="application/json", body="{}")
+            else:
+                route.fulfill(status=response["status"], headers=response["headers"],
+                              body=response["body"])
+
+        context.route(re.compile(url_pattern), handle)
+
+
+def replay_profile_dir(label: str) -> str:
+    """A throwaway profile directory so replays never touch the real profile."""
+    return tempfile.mkdtemp(prefix=f"valid-social-replay-{label}-")
+
+
+# ---- Step timings ----
+
+
+class HarSession:
+    """Step timings of a recorded or replayed context."""
+
+    def __init__(
+        self,
+        label: str,
+        bundle_dir: str,
+        mode: str,
+        baseline_dir: Optional[str] = None,
+        har_path: Optional[str] = None,
+        temp_profile: Optional[str] = None,
+    ) -> None:
+        self.label = label
+        self.bundle_dir = bundle_dir
+        self.mode = mode
+        self.baseline_dir = baseline_dir
+        self.har_path = har_path
+        self.temp_profile = temp_profile
+        self.started = time.monotonic()
+        self.steps: List[Dict[str, Any]] = []
+
+    def mark(self, action: str) -> None:
+        now = time.monotonic() - self.started
+        if self.steps:
+            self.steps[-1]["duration"] = round(now - self.steps[-1]["at"], 3)
+        self.steps.append({"step": action, "at": round(now, 3), "duration": None,
+                           "idle": 0.0})
+
+    def add_idle(self, seconds: float) -> None:
+        if self.steps:
+            self.steps[-1]["idle"] = round(self.steps[-1]["idle"] + seconds, 3)
+
+    def finish(self) -> None:
+        """Write steps.json, scrub a recording and compare a replay with its baseline."""
+        end = time.monotonic() - self.started
+        if self.steps and self.steps[-1]["duration"] is None:
+            self.steps[-1]["duration"] = round(end - self.steps[-1]["at"], 3)
+
+        with open(os.path.join(self.bundle_dir, STEPS_FILE_NAME), "w", encoding="utf-8") as f:
+            json.dump({"label": self.label, "mode": self.mode, "total": round(end, 3),
+                       "steps": self.steps}, f, indent=2)
+
+        if self.mode == "record" and self.har_path and os.path.isfile(self.har_path):
+            try:
+                removed = scrub_har_file(self.har_path)
+            except Exception as exc:
+                # Never leave an unscrubbed recording behind
+                os.remove(self.har_path)
+                print(f"❌ Could not scrub {self.har_path}, recording deleted: {exc}")
+            else:
+                print(f"📼 Recorded {self.label} to {self.bundle_dir} "
+                      f"({removed} secret value(s) scrubbed).")
+        if self.baseline_dir:
+            compare_step_timings(self.baseline_dir, self.bundle_dir)
+        if self.temp_profile:
+            shutil.rmtree(self.temp_profile, ignore_errors=True)
+
+    def discard(self) -> None:
+        """Clean up after a launch that never produced a context."""
+        if self.temp_profile:
+            shutil.rmtree(self.temp_profile, ignore_errors=True)
+        try:
+            os.rmdir(self.bundle_dir)
+        except OSError:
+            pass  # Not empty
+
+
+def _load_steps(bundle_dir: str) -> Dict[str, float]:
+    try:
+        with open(os.path.join(bundle_dir, STEPS_FILE_NAME), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    durations: Dict[str, float] = {}
+    for step in data.get("steps", []):
+        active = max((step["duration"] or 0.0) - step.get("idle", 0.0), 0.0)
+        durations[step["step"]] = durations.get(step["step"], 0.0) + active
+    return durations
+
+
+def compare_step_timings(baseline_dir: str, current_dir: str) -> None:
+    """Print each step's active time (pauses left out) next to the baseline's."""
+    baseline = _load_steps(baseline_dir)
+    current = _load_steps(current_dir)
+    if not current:
+        return
+    print(f"\n⏱️ Step timings vs {os.path.basename(baseline_dir)}:")
+    for step, seconds in current.items():
+        before = baseline.get(step)
+        if before is None:
+            print(f"   {step:<20} {seconds:7.2f}s   (new step)")
+            continue
+        delta = seconds - before
+        flag = " ⚠️" if before > 0 and delta > max(1.0, before * 0.5) else ""
+        print(f"   {step:<20} {seconds:7.2f}s   was {before:7.2f}s   {delta:+.2f}s{flag}")
+    for step in baseline:
+        if step not in current:
+            print(f"   {step:<20}    missing   was {baseline[step]:7.2f}s ⚠️")
+
+
+def attach_har_session(context: BrowserContext, session: HarSession) -> None:
+    _SESSIONS[id(context)] = session
+
+
+def record_step(context: BrowserContext, action: str) -> None:
+    """Note the start of ``action`` if the context is being recorded or replayed."""
+    session = _SESSIONS.get(id(context))
+    if session is not None:
+        session.mark(action)
+
+
+def record_idle(context: BrowserContext, seconds: float) -> None:
+    """Note a deliberate pause of ``seconds`` in the current step."""
+    session = _SESSIONS.get(id(context))
+    if session is not None:
+        session.add_idle(seconds)
+
+
+def finish_har_session(context: BrowserContext) -> None:
+    """Call after the context has closed, so the HAR file is complete."""
+    session = _SESSIONS.pop(id(context), None)
+    if session is None:
+        return
+    try:
+        session.finish()
+    except Exception as exc:
+        print(f"⚠️ Could not finish HAR bundle {session.bundle_dir}: {exc}")
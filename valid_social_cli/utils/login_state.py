@@ -0,0 +1,97 @@
+"""
+Logged-in detection for each supported platform.
+
+A platform counts as logged in once its feed element is rendered on the
+page. A session cookie alone is not enough, since a stale one survives in
+the profile after the session has expired. It only counts while the page has
+left the login, checkpoint and 2FA screens and shows no password field.
+Every check is cheap and never navigates, so they are safe to poll.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Tuple
+from playwright.sync_api import BrowserContext, Page
+
+# platform -> (cookie url, session cookie name, feed selector)
+LOGIN_SIGNALS: Dict[str, Tuple[str, str, str]] = {
+    "instagram": (
+        "https://www.instagram.com",
+        "sessionid",
+        "svg[aria-label='Home']",
+    ),
+    "x": (
+        "https://x.com",
+        "auth_token",
+        "[data-testid='primaryColumn'] [data-testid='tweetTextarea_0']",
+    ),
+    "facebook": (
+        "https://www.facebook.com",
+        "c_user",
+        "div[role='feed']",
+    ),
+}
+
+# URL fragments of login, checkpoint and 2FA screens (matched lowercase).
+LOGIN_PAGE_MARKERS: Tuple[str, ...] = (
+    "/login",
+    "/accounts/login",
+    "/challenge",
+    "/checkpoint",
+    "/two_factor",
+    "/i/flow/",
+    "/account/access",
+    "/recover",
+)
+
+PASSWORD_FIELD_SELECTOR = "input[type='password']"
+
+
+def has_session_cookie(context: BrowserContext, platform: str) -> bool:
+    """Return True if the platform's session cookie is set in ``context``."""
+    url, cookie_name, _feed_selector = LOGIN_SIGNALS[platform]
+    try:
+        cookies = context.cookies(url)
+    except Exception:
+        return False
+    return any(c.get("name") == cookie_name and c.get("value") for c in cookies)
+
+
+def has_feed(page: Page, platform: str) -> bool:
+    """Return True if the platform's feed element is rendered on ``page``."""
+    _url, _cookie_name, feed_selector = LOGIN_SIGNALS[platform]
+    try:
+        return page.locator(feed_selector).count() > 0
+    except Exception:
+        return False
+
+
+def on_login_screen(page: Page) -> bool:
+    """Return True if ``page`` is on a login/checkpoint URL or asks for a password."""
+    url = page.url.lower()
+    if any(marker in url for marker in LOGIN_PAGE_MARKERS):
+        return True
+    try:
+        return page.locator(PASSWORD_FIELD_SELECTOR).count() > 0
+    except Exception:
+        return True
+
+
+def is_logged_in(context: BrowserContext, platform: str, page: Page) -> bool:
+    """
+    Check whether ``page`` shows a logged-in session for ``platform``.
+
+    Args:
+        context (BrowserContext): Context opened on the platform's profile.
+        platform (str): One of the keys of LOGIN_SIGNALS.
+        page (Page): The platform's page in ``context``.
+
+    Returns:
+        bool: True once the feed is rendered, or the session cookie is set
+        and the page is past the login screens.
+    """
+    if page.is_closed():
+        return False
+    if has_feed(page, platform):
+        return True
+    return has_session_cookie(context, platform) and not on_login_screen(page)
@@ -0,0 +1,268 @@
+"""
+On-disk index of media files for fast terminal search over large libraries.
+
+The index stores, per directory, its mtime plus the media files and
+subdirectories it contains. A directory's mtime changes whenever an entry is
+added, removed or renamed inside it, so a refresh only needs one ``stat`` per
+directory and re-lists (with ``os.scandir``) just the directories that
+changed. After the first build, rescanning a large share is close to free.
+
+Usage:
+    index = MediaIndex()
+    index.refresh(["/mnt/media"])
+    for path in index.search("launch banner", ["/mnt/media"]):
+        print(path)
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import glob
+import heapq
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+MEDIA_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".webp", ".gif",
+    ".mp4", ".mov", ".avi", ".mkv",
+}
+MEDIA_INDEX_PATH: str = os.path.join("storage", "media_index.json")
+MEDIA_DIRS_ENV: str = "VALID_SOCIAL_MEDIA_DIRS"
+
+INDEX_VERSION = 1
+
+
+def is_media_file(name: str) -> bool:
+    """Return True if ``name`` has a supported image or video extension."""
+    return os.path.splitext(name)[1].lower() in MEDIA_EXTENSIONS
+
+
+def default_media_roots() -> List[str]:
+    """
+    Media directories from VALID_SOCIAL_MEDIA_DIRS (os.pathsep separated),
+    falling back to the current working directory.
+    """
+    value = os.getenv(MEDIA_DIRS_ENV, "")
+    roots = [os.path.abspath(os.path.expanduser(p))
+             for p in value.split(os.pathsep) if p.strip()]
+    return roots or [os.getcwd()]
+
+
+def iter_directory_media(root: str) -> Iterator[str]:
+    """Yield media files under ``root`` (recursively, sorted per directory)."""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs: List[str] = []
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file() and is_media_file(entry.name):
+                    yield entry.path
+            except OSError:
+                continue
+        stack.extend(reversed(subdirs))
+
+
+def expand_media_paths(patterns: Iterable[str]) -> Iterator[str]:
+    """
+    Lazily expand ``--media`` values into media file paths.
+
+    Directories are walked recursively, glob patterns (including ``**``) are
+    expanded with ``glob.iglob``, and plain paths are passed through as-is.
+    Nothing is touched on disk until the iterator is consumed.
+    """
+    for pattern in patterns:
+        pattern = os.path.expanduser(pattern)
+        if os.path.isdir(pattern):
+            yield from iter_directory_media(pattern)
+        elif glob.has_magic(pattern):
+            for path in glob.iglob(pattern, recursive=True):
+                if os.path.isfile(path) and is_media_file(path):
+                    yield path
+        else:
+            yield pattern
+
+
+def fuzzy_score(query: str, text: str) -> Optional[float]:
+    """
+    Score ``text`` against a whitespace-separated fuzzy ``query``.
+
+    Every query word must appear in ``text`` as a case-insensitive
+    subsequence. Consecutive characters, matches in the file name and
+    shorter paths score higher. Returns None when there is no match.
+    """
+    haystack = text.lower()
+    basename_start = haystack.rfind(os.sep) + 1
+    score = 0.0
+
+    for word in query.lower().split():
+        if word in haystack[basename_start:]:
+            score += 10 * len(word)
+            continue
+
+        pos = -1
+        prev = -2
+        for ch in word:
+            pos = haystack.find(ch, pos + 1)
+            if pos < 0:
+                return None
+            score += 3 if pos == prev + 1 else 1
+            if pos >= basename_start:
+                score += 1
+            prev = pos
+
+    return score - len(haystack) / 100
+
+
+class MediaIndex:
+    """Incrementally refreshed index of media files under some roots."""
+
+    def __init__(self, path: str = MEDIA_INDEX_PATH) -> None:
+        self.path = path
+        # abs dir -> {"mtime_ns": int, "files": [names], "subdirs": [names]}
+        self.dirs: Dict[str, Dict] = {}
+        self.load()
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.dirs = data.get("dirs", {})
+        except (OSError, ValueError):
+            self.dirs = {}
+
+    def save(self) -> None:
+        """Write the index atomically so a crash never leaves it truncated."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "dirs": self.dirs},
+                      f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def refresh(self, roots: Iterable[str]) -> Tuple[int, int]:
+        """
+        Bring the index up to date for ``roots``.
+
+        Returns:
+            tuple[int, int]: (directories re-listed, directories reused)
+        """
+        scanned = 0
+        reused = 0
+        visited = set()
+        abs_roots = [os.path.abspath(r) for r in roots]
+
+        stack = list(abs_roots)
+        while stack:
+            current = stack.pop()
+            if current in visited:
+                continue
+            visited.add(current)
+
+            try:
+                mtime_ns = os.stat(current).st_mtime_ns
+            except OSError:
+                continue
+
+            entry = self.dirs.get(current)
+            if entry is None or entry.get("mtime_ns") != mtime_ns:
+                entry = self._scan_dir(current, mtime_ns)
+                if entry is None:
+                    continue
+                self.dirs[current] = entry
+                scanned += 1
+            else:
+                reused += 1
+
+            stack.extend(os.path.join(current, d) for d in entry["subdirs"])
+
+        # Forget directories under these roots that no longer exist.
+        removed = 0
+        for directory in list(self.dirs):
+            if directory not in visited and any(
+                    self._is_under(directory, root) for root in abs_roots):
+                del self.dirs[directory]
+                removed += 1
+
+        if scanned or removed:
+            self.save()
+        return scanned, reused
+
+    def _scan_dir(self, directory: str, mtime_ns: int) -> Optional[Dict]:
+        files: List[str] = []
+        subdirs: List[str] = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.name.startswith("."):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        elif entry.is_file() and is_media_file(entry.name):
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        files.sort()
+        subdirs.sort()
+        return {"mtime_ns": mtime_ns, "files": files, "subdirs": subdirs}
+
+    @staticmethod
+    def _is_under(path: str, root: str) -> bool:
+        return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+    def files(self, roots: Optional[Iterable[str]] = None) -> Iterator[str]:
+        """Yield every indexed media file, optionally limited to ``roots``."""
+        abs_roots = [os.path.abspath(r) for r in roots] if roots else None
+        for directory, entry in self.dirs.items():
+            if abs_roots and not any(self._is_under(directory, r) for r in abs_roots):
+                continue
+            for name in entry["files"]:
+                yield os.path.join(directory, name)
+
+    def search(
+        self,
+        query: str,
+        roots: Optional[Iterable[str]] = None,
+        limit: int = 20,
+    ) -> List[str]:
+        """
+        Return up to ``limit`` indexed files that best match ``query``.
+
+        A query containing glob characters (``*``, ``?``, ``[``) is matched
+        against file names with fnmatch instead of fuzzy scoring.
+        """
+        if not query.strip():
+            return []
+
+        if glob.has_magic(query):
+            matches: List[str] = []
+            for path in self.files(roots):
+                if fnmatch.fnmatch(os.path.basename(path).lower(), query.lower()):
+                    matches.append(path)
+                    if len(matches) >= limit:
+                        break
+            return matches
+
+        scored = (
+            (score, path)
+            for path in self.files(roots)
+            for score in (fuzzy_score(query, path),)
+            if score is not None
+        )
+        return [path for _score, path in heapq.nlargest(limit, scored)]
@@ -0,0 +1,133 @@
+"""
+Hand media files to the browser without loading them into Python memory.
+
+Media is always passed to Playwright as file paths, never as in-memory
+buffers. With a local browser Playwright only sends the paths and Chromium
+reads the files itself; with a remote browser Playwright streams each file
+to the browser host in fixed-size chunks (the ``playwright>=1.38`` pin
+guarantees this). Either way the worker's memory stays flat however large
+the video is.
+
+Files are only ``os.stat``-ed here: missing files, folders and empty files
+are rejected before the upload step starts, sizes are reported up front and
+a heartbeat is printed while a large transfer is in flight.
+
+Usage:
+    file_input = page.locator('input[type="file"]').first
+    set_media_files(file_input, ["clip.mp4", "cover.jpg"])
+"""
+
+from __future__ import annotations
+
+import os
+import stat
+import threading
+import time
+from typing import List, Optional, Union
+from playwright.sync_api import Locator
+
+# Seconds between "still transferring" messages for large transfers.
+PROGRESS_INTERVAL = 5.0
+PROGRESS_MIN_BYTES = 100 * 1024 * 1024
+
+
+class MediaTransferError(Exception):
+    """Raised when media is missing, not a regular file, or empty."""
+
+
+class MediaFile:
+    """An absolute media path and its size in bytes."""
+
+    def __init__(self, path: str, size: int) -> None:
+        self.path = path
+        self.size = size
+
+
+def format_size(num_bytes: float) -> str:
+    """Human readable size, e.g. ``1.4 GB``."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1024 or unit == "GB":
+            return f"{num_bytes:.0f} {unit}" if unit == "B" else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GB"
+
+
+def resolve_media(media: Union[str, List[str]]) -> List[MediaFile]:
+    """
+    Resolve and validate media paths without reading them.
+
+    Args:
+        media: A path or list of paths.
+
+    Returns:
+        One MediaFile per path, in order.
+
+    Raises:
+        MediaTransferError: If a path is missing, not a file, or empty.
+    """
+    paths = [media] if isinstance(media, str) else list(media)
+    files: List[MediaFile] = []
+    for path in paths:
+        path = os.path.abspath(os.path.expanduser(path))
+        try:
+            info = os.stat(path)
+        except OSError as exc:
+            raise MediaTransferError(
+                f"Media file not found: {path} ({exc.strerror})") from exc
+        if not stat.S_ISREG(info.st_mode):
+            raise MediaTransferError(f"Not a regular file: {path}")
+        if info.st_size == 0:
+            raise MediaTransferError(f"Media file is empty: {path}")
+        files.append(MediaFile(path, info.st_size))
+    return files
+
+
+def _report_progress(stop: threading.Event, total: int, started: float) -> None:
+    while not stop.wait(PROGRESS_INTERVAL):
+        elapsed = time.monotonic() - started
+        print(f"⏳ Still transferring {format_size(total)} to the browser... "
+              f"({elapsed:.0f}s)")
+
+
+def set_media_files(
+    file_input: Locator,
+    media: Union[str, List[str]],
+    timeout: Optional[float] = None,
+) -> List[MediaFile]:
+    """
+    Select ``media`` on a file input by path, so it is never read into memory.
+
+    Args:
+        file_input: Locator for an ``<input type="file">``.
+        media: A path or list of paths.
+        timeout: Optional Playwright timeout in milliseconds.
+
+    Returns:
+        The files that were handed over.
+
+    Raises:
+        MediaTransferError: If the media is invalid.
+    """
+    files = resolve_media(media)
+    if not files:
+        raise MediaTransferError("No media files to upload.")
+
+    total = sum(f.size for f in files)
+
+    for f in files:
+        print(f"📎 {os.path.basename(f.path)} ({format_size(f.size)})")
+
+    stop = threading.Event()
+    started = time.monotonic()
+    if total >= PROGRESS_MIN_BYTES:
+        threading.Thread(target=_report_progress, args=(stop, total, started),
+                         daemon=True).start()
+    try:
+        file_input.set_input_files([f.path for f in files], timeout=timeout)
+    finally:
+        stop.set()
+
+    elapsed = time.monotonic() - started
+    print(f"📤 Handed {len(files)} file(s), {format_size(total)}, "
+          f"to the browser in {elapsed:.1f}s.")
+    return files
@@ -0,0 +1,215 @@
+"""
+Speculative browser warm-up while the user is still answering prompts.
+
+A WarmSession runs a platform's ``open_<platform>()`` on a background thread
+as soon as the platform is chosen: Playwright driver start, Chromium launch,
+feed navigation and login check all overlap with the caption and media
+prompts. The same thread then waits for the publish job, because Playwright's
+sync API objects may only be used from the thread that created them.
+
+While the user is typing, anything a warm-up prints (launch messages, a
+"not logged in" notice, tracebacks) is held back so it does not land in the
+middle of the caption editor. It is shown when ``publish()`` is called.
+The warm-up's budget is bounded by both the per-platform and the whole-post
+deadline.
+
+Usage:
+    warm = WarmSession("X", open_x, publish_to_x, {"headless": True})
+    warm.start()
+    ...  # prompt the user
+    warm.publish(caption, media_path)   # or warm.cancel() on abort
+"""
+
+from __future__ import annotations
+
+import io
+import queue
+import sys
+import threading
+import traceback
+from typing import Any, Callable, Dict, Optional, TextIO, Tuple
+from valid_social_cli.utils.browser_session import BrowserSession
+from valid_social_cli.utils.deadline import Deadline, DeadlineExceeded
+
+Opener = Callable[..., Optional[BrowserSession]]
+Publisher = Callable[[BrowserSession, str, Any], None]
+
+# How long to wait for a cancelled warm-up to close its browser.
+CANCEL_JOIN_TIMEOUT = 30.0
+
+
+class _WarmOutput:
+    """Stream wrapper that holds back writes made by buffering warm-up threads."""
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+
+    def write(self, text: str) -> int:
+        thread = threading.current_thread()
+        if isinstance(thread, WarmSession):
+            with thread.output_lock:
+                if thread.buffering:
+                    return thread.output.write(text)
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.stream, name)
+
+
+def _hold_warm_output() -> None:
+    if not isinstance(sys.stdout, _WarmOutput):
+        sys.stdout = _WarmOutput(sys.stdout)  # type: ignore[assignment]
+    if not isinstance(sys.stderr, _WarmOutput):
+        sys.stderr = _WarmOutput(sys.stderr)  # type: ignore[assignment]
+
+
+def _restore_output() -> None:
+    if isinstance(sys.stdout, _WarmOutput):
+        sys.stdout = sys.stdout.stream
+    if isinstance(sys.stderr, _WarmOutput):
+        sys.stderr = sys.stderr.stream
+
+
+class WarmSession(threading.Thread):
+    """Background thread owning one platform's browser session."""
+
+    def __init__(
+        self,
+        name: str,
+        opener: Opener,
+        publisher: Publisher,
+        launch_options: Optional[Dict[str, Any]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> None:
+        super().__init__(name=f"warm-{name.lower()}", daemon=True)
+        self.platform = name
+        self.opener = opener
+        self.publisher = publisher
+        self.launch_options = dict(launch_options or {})
+        # Budget for the warm-up itself (launch, navigation, login check).
+        self.deadline = deadline
+        self.ready = threading.Event()
+        self.opened = False
+        self.error: Optional[BaseException] = None
+        # Output held back until publish(); see _WarmOutput.
+        self.output = io.StringIO()
+        self.output_lock = threading.Lock()
+        self.buffering = True
+        # A single job: (caption, media, deadline) to publish, or None to cancel.
+        self._jobs: "queue.Queue[Optional[Tuple[str, Any, Optional[Deadline]]]]" = queue.Queue(
+            maxsize=1)
+
+    def run(self) -> None:
+        session: Optional[BrowserSession] = None
+        try:
+            session = self.opener(self.deadline, **self.launch_options)
+            self.opened = session is not None
+        except DeadlineExceeded as exc:
+            self.error = exc
+            print(f"⏱️ Warming up {self.platform} cancelled: {exc}")
+        except BaseException as exc:
+            self.error = exc
+            print(f"❌ Failed to warm up {self.platform}:")
+            traceback.print_exc()
+        finally:
+            self.ready.set()
+
+        job: Optional[Tuple[str, Any, Optional[Deadline]]] = None
+        try:
+            job = self._jobs.get()
+            if job is None or session is None:
+                return
+            caption, media_path, deadline = job
+            try:
+                session.reset_deadline(deadline)
+                self.publisher(session, caption, media_path)
+            except DeadlineExceeded as exc:
+                self.error = exc
+                session.capture_failure(exc)
+                print(f"⏱️ Posting to {self.platform} cancelled: {exc}")
+            except BaseException as exc:
+                self.error = exc
+                print(f"❌ Posting to {self.platform} failed:")
+                traceback.print_exc()
+        finally:
+            if session is not None:
+                # Stay quiet when a warm-up is simply thrown away.
+                session.close(show_errors=job is not None)
+
+    def publish(self, caption: str, media_path: Any, deadline: Optional[Deadline] = None) -> None:
+        """Hand the post to the warm session and wait for it to finish."""
+        self.show_output()
+        if not self.ready.is_set():
+            print(f"⏳ Waiting for {self.platform} to finish warming up...")
+        self._put((caption, media_path, deadline))
+        self.join()
+        if not self.opened:
+            print(f"⚠️ {self.platform} was not posted: its browser could not be opened.")
+
+    def show_output(self) -> None:
+        """Print what the warm-up has said so far and stop holding it back."""
+        with self.output_lock:
+            self.buffering = False
+            held = self.output.getvalue()
+            self.output = io.StringIO()
+        if held:
+            sys.stdout.write(held)
+            sys.stdout.flush()
+
+    def cancel(self, timeout: float = CANCEL_JOIN_TIMEOUT) -> None:
+        """Throw the warm-up away and close its browser."""
+        self._put(None)
+        if self.is_alive():
+            self.join(timeout)
+
+    def _put(self, job: Optional[Tuple[str, Any, Optional[Deadline]]]) -> None:
+        try:
+            self._jobs.put_nowait(job)
+        except queue.Full:
+            pass  # A job (or cancellation) is already queued
+
+
+def start_warm_sessions(
+    targets: Dict[str, Tuple[Opener, Publisher]],
+    launch_options: Optional[Dict[str, Any]] = None,
+    warmup_seconds: Optional[float] = None,
+    total_seconds: Optional[float] = None,
+) -> Dict[str, WarmSession]:
+    """
+    Start one WarmSession per target platform and return them by name.
+
+    Args:
+        targets: Platform name -> (opener, publisher).
+        launch_options: Keyword arguments for every opener.
+        warmup_seconds: Budget for each platform's warm-up.
+        total_seconds: Budget shared by all warm-ups; bounds ``warmup_seconds``.
+
+    Returns:
+        The started WarmSessions, keyed by platform name.
+    """
+    sessions: Dict[str, WarmSession] = {}
+    total = Deadline(total_seconds)
+    if targets:
+        _hold_warm_output()
+    for name, (opener, publisher) in targets.items():
+        warm = WarmSession(name, opener, publisher, launch_options,
+                           Deadline(warmup_seconds, parent=total))
+        warm.start()
+        sessions[name] = warm
+    if sessions:
+        print(f"🔥 Warming up {', '.join(sessions)} in the background...")
+    return sessions
+
+
+def cancel_warm_sessions(sessions: Dict[str, WarmSession]) -> None:
+    """Cancel every warm session that was not used."""
+    for warm in sessions.values():
+        warm._put(None)
+    for warm in sessions.values():
+        if warm.is_alive():
+            warm.join(CANCEL_JOIN_TIMEOUT)
+    sessions.clear()
+    _restore_output()
@@ -0,0 +1,279 @@
+"""
+Exclusive, queued leases on persistent browser profiles.
+
+Chromium refuses (or corrupts state) when two processes open the same
+``user_data_dir``. Before launching a profile we take a lease on it: an
+advisory OS file lock (``fcntl.flock`` / ``msvcrt.locking``) on a
+``<profile>.lease`` file next to the profile. Different profiles never wait
+on each other.
+
+Waiters queue fairly: each drops a ticket, named by its arrival time, in
+``<profile>.queue/`` and only tries the lock once its ticket is the oldest
+live one. Tickets are heartbeated while waiting, so a waiter that crashed is
+skipped once its ticket goes stale. The OS releases the lock itself when a
+holder crashes. Chromium's own ``SingletonLock`` is then checked, and a lock
+left behind by a dead process is removed before launch.
+
+Each wait and hold time is appended to ``storage/profile_leases.jsonl``.
+
+Usage:
+    lease = acquire_profile_lease("storage/browser_profiles/x_profile")
+    try:
+        ...  # launch and use the profile
+    finally:
+        lease.release()
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import time
+import uuid
+from typing import Dict, List, Optional
+from playwright.sync_api import BrowserContext
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
+
+LEASE_METRICS_PATH = os.path.join("storage", "profile_leases.jsonl")
+POLL_INTERVAL = 0.2
+HEARTBEAT_INTERVAL = 2.0
+# A waiting ticket whose heartbeat is older than this belongs to a dead waiter.
+STALE_TICKET_SECONDS = 15.0
+# Only waits longer than this are reported on the console.
+REPORT_WAIT_SECONDS = 1.0
+
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+CHROMIUM_SINGLETON_FILES = ("SingletonLock", "SingletonCookie", "SingletonSocket")
+
+_LEASES: Dict[int, "ProfileLease"] = {}
+
+
+class ProfileLeaseTimeout(Exception):
+    """Raised when a profile lease is not granted in time."""
+
+
+def try_lock_file(fd: int) -> bool:
+    """Take an exclusive advisory lock on ``fd`` without blocking."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def unlock_file(fd: int) -> None:
+    """Release a lock taken with try_lock_file."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    except OSError:
+        pass
+
+
+def pid_alive(pid: int) -> bool:
+    """True if a process with ``pid`` exists on this machine."""
+    if os.name == "nt":
+        # os.kill(pid, 0) would send CTRL_C_EVENT on Windows
+        import ctypes
+        handle = ctypes.windll.kernel32.OpenProcess(
+            PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # Exists but belongs to someone else
+    return True
+
+
+def clear_stale_singleton_lock(user_data_dir: str) -> bool:
+    """
+    Remove Chromium's singleton files if the process that left them is gone.
+
+    Only call this while holding the profile's lease. Chromium stores the
+    owner as a ``<hostname>-<pid>`` symlink; a different hostname means the
+    profile was copied or the container restarted, so it is stale too.
+
+    Returns:
+        True if stale files were removed.
+    """
+    try:
+        owner = os.readlink(os.path.join(user_data_dir, "SingletonLock"))
+    except OSError:
+        return False  # No lock, or not a symlink (Windows releases its own)
+
+    host, _, pid = owner.rpartition("-")
+    if host == socket.gethostname() and pid.isdigit() and pid_alive(int(pid)):
+        return False
+
+    for name in CHROMIUM_SINGLETON_FILES:
+        try:
+            os.unlink(os.path.join(user_data_dir, name))
+        except OSError:
+            pass
+    print(f"🧹 Removed stale Chromium profile lock left by {owner}.")
+    return True
+
+
+class ProfileLease:
+    """A held lease on one profile. Release it once the browser is closed."""
+
+    def __init__(self, user_data_dir: str, fd: int, waited: float, queued_behind: int) -> None:
+        self.user_data_dir = user_data_dir
+        self.fd = fd
+        self.waited = waited
+        self.queued_behind = queued_behind
+        self.acquired_at = time.monotonic()
+        self.released = False
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.user_data_dir)
+
+    def release(self) -> None:
+        """Unlock the profile and record the metrics. Safe to call twice."""
+        if self.released:
+            return
+        self.released = True
+        held = time.monotonic() - self.acquired_at
+        unlock_file(self.fd)
+        os.close(self.fd)
+        _record_metrics({
+            "profile": self.name,
+            "pid": os.getpid(),
+            "waited": round(self.waited, 3),
+            "held": round(held, 3),
+            "queued_behind": self.queued_behind,
+            "released_at": time.time(),
+        })
+
+
+def _record_metrics(entry: Dict[str, object]) -> None:
+    try:
+        os.makedirs(os.path.dirname(LEASE_METRICS_PATH), exist_ok=True)
+        with open(LEASE_METRICS_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+    except OSError:
+        pass  # Metrics are best effort
+
+
+def _live_tickets(queue_dir: str) -> List[str]:
+    """Tickets in arrival order, deleting those whose waiter has died."""
+    now = time.time()
+    live: List[str] = []
+    try:
+        names = sorted(os.listdir(queue_dir))
+    except OSError:
+        return live
+    for name in names:
+        path = os.path.join(queue_dir, name)
+        try:
+            if now - os.path.getmtime(path) > STALE_TICKET_SECONDS:
+                os.unlink(path)
+                continue
+        except OSError:
+            continue  # Removed meanwhile
+        live.append(name)
+    return live
+
+
+def acquire_profile_lease(user_data_dir: str, timeout: Optional[float] = None) -> ProfileLease:
+    """
+    Wait for an exclusive lease on ``user_data_dir``, first come first served.
+
+    Args:
+        user_data_dir: Profile directory to lease.
+        timeout: Seconds to wait at most; None waits for as long as it takes.
+
+    Returns:
+        The held ProfileLease.
+
+    Raises:
+        ProfileLeaseTimeout: If the lease is not granted within ``timeout``.
+    """
+    user_data_dir = os.path.abspath(user_data_dir)
+    queue_dir = user_data_dir + ".queue"
+    os.makedirs(queue_dir, exist_ok=True)
+    fd = os.open(user_data_dir + ".lease", os.O_RDWR | os.O_CREAT, 0o644)
+
+    ticket = f"{time.time_ns():020d}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    ticket_path = os.path.join(queue_dir, ticket)
+    open(ticket_path, "w").close()
+
+    started = time.monotonic()
+    last_heartbeat = started
+    queued_behind: Optional[int] = None
+    reported = False
+    name = os.path.basename(user_data_dir)
+    try:
+        while True:
+            tickets = _live_tickets(queue_dir)
+            if ticket not in tickets:
+                # Our heartbeat lapsed (e.g. the machine slept); queue again.
+                open(ticket_path, "w").close()
+                tickets = _live_tickets(queue_dir)
+            position = tickets.index(ticket) if ticket in tickets else 0
+            if queued_behind is None:
+                queued_behind = position
+
+            if position == 0 and try_lock_file(fd):
+                break
+
+            now = time.monotonic()
+            if timeout is not None and now - started >= timeout:
+                raise ProfileLeaseTimeout(
+                    f"{name} is still in use after {timeout:.1f}s")
+            if not reported and now - started >= REPORT_WAIT_SECONDS:
+                reported = True
+                ahead = f" behind {position} other run(s)" if position else ""
+                print(f"⏳ {name} is in use by another run; waiting{ahead}...")
+            if now - last_heartbeat >= HEARTBEAT_INTERVAL:
+                last_heartbeat = now
+                try:
+                    os.utime(ticket_path)
+                except OSError:
+                    pass
+            time.sleep(POLL_INTERVAL)
+    except BaseException:
+        os.close(fd)
+        raise
+    finally:
+        try:
+            os.unlink(ticket_path)
+        except OSError:
+            pass
+
+    waited = time.monotonic() - started
+    if waited >= REPORT_WAIT_SECONDS:
+        print(f"🔓 Got {name} after waiting {waited:.1f}s.")
+    clear_stale_singleton_lock(user_data_dir)
+    return ProfileLease(user_data_dir, fd, waited, queued_behind or 0)
+
+
+def attach_profile_lease(context: BrowserContext, lease: ProfileLease) -> None:
+    """Keep ``lease`` until ``context`` is closed."""
+    _LEASES[id(context)] = lease
+
+
+def release_profile_lease(context: BrowserContext) -> None:
+    """Release the lease held for ``context``, if any."""
+    lease = _LEASES.pop(id(context), None)
+    if lease is not None:
+        lease.release()
@@ -0,0 +1,300 @@
+"""
+Live view of headless browser pages, served on localhost.
+
+Lets a user log in to a headless profile from any browser: each page is
+screencast over the Chrome DevTools Protocol (``Page.startScreencast``) and
+served as an MJPEG stream by a small HTTP server bound to 127.0.0.1. Clicks,
+scrolling and typing in the viewer are posted back and replayed on the page.
+
+Playwright's sync API may only be used from the thread that created it, so
+the HTTP server threads never touch a page: frames are acknowledged and
+queued input is replayed by ``pump()``, which the caller runs on its own
+thread between waits. Every URL carries a random token, so other local users
+cannot watch or drive the session. On a remote server, forward the port with
+``ssh -L``.
+
+Usage:
+    view = RemoteView()
+    view.add_page("X", page)
+    print(view.start())          # http://127.0.0.1:<port>/?token=...
+    while waiting:
+        view.pump()
+        page.wait_for_timeout(100)
+    view.close()
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import queue
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+from playwright.sync_api import CDPSession, Page
+
+VIEW_HOST = "127.0.0.1"
+JPEG_QUALITY = 60
+MAX_QUEUED_INPUTS = 200
+
+# Keys replayed with keyboard.press(); anything else is typed as text.
+SPECIAL_KEYS = {
+    "Enter", "Backspace", "Tab", "Escape", "Delete", "Home", "End",
+    "ArrowLeft", "ArrowRight", "ArrowUp", "ArrowDown", "PageUp", "PageDown",
+}
+
+VIEWER_HTML = """<!doctype html>
+<html><head><meta charset="utf-8"><title>valid-social login</title>
+<style>
+body{margin:0;background:#111;color:#eee;font-family:sans-serif}
+nav{padding:8px;display:flex;gap:8px;align-items:center}
+nav a{color:#8cf;padding:4px 8px;border-radius:4px;text-decoration:none}
+nav a.active{background:#8cf;color:#111}
+img{display:block;max-width:100%;margin:0 auto;cursor:pointer;outline:none}
+</style></head>
+<body><nav id="tabs"></nav><img id="screen" tabindex="0" alt="Loading...">
+<script>
+const token = new URLSearchParams(location.search).get("token");
+const pages = __PAGES__;
+let current = pages.length ? pages[0] : null;
+const img = document.getElementById("screen");
+const tabs = document.getElementById("tabs");
+function show(name) {
+  current = name;
+  img.src = "/stream/" + encodeURIComponent(name) + "?token=" + token;
+  tabs.innerHTML = "";
+  for (const p of pages) {
+    const a = document.createElement("a");
+    a.href = "#"; a.textContent = p; a.className = p === current ? "active" : "";
+    a.onclick = (e) => { e.preventDefault(); show(p); };
+    tabs.appendChild(a);
+  }
+  img.focus();
+}
+function send(event) {
+  if (!current) return;
+  fetch("/input/" + encodeURIComponent(current) + "?token=" + token,
+        {method: "POST", body: JSON.stringify(event)});
+}
+function point(e) {
+  const r = img.getBoundingClientRect();
+  return {x: (e.clientX - r.left) / r.width, y: (e.clientY - r.top) / r.height};
+}
+img.addEventListener("click", (e) => { img.focus(); send({type: "click", ...point(e)}); });
+img.addEventListener("wheel", (e) => { e.preventDefault(); send({type: "wheel", dx: e.deltaX, dy: e.deltaY}); });
+img.addEventListener("keydown", (e) => {
+  if (e.ctrlKey || e.metaKey) return;
+  e.preventDefault();
+  if (e.key.length === 1) send({type: "text", text: e.key});
+  else send({type: "key", key: e.key});
+});
+img.addEventListener("paste", (e) => send({type: "text", text: e.clipboardData.getData("text")}));
+if (current) show(current);
+</script></body></html>
+"""
+
+
+class _ScreencastTarget:
+    """One page being screencast: latest frame plus frames awaiting an ack."""
+
+    def __init__(self, page: Page, cdp: CDPSession) -> None:
+        self.page = page
+        self.cdp = cdp
+        self.frame: Optional[bytes] = None
+        self.frame_id = 0
+        self.pending_acks: List[int] = []
+        self.inputs: "queue.Queue[Dict[str, Any]]" = queue.Queue(
+            maxsize=MAX_QUEUED_INPUTS)
+
+
+class RemoteView:
+    """Screencast of headless pages with input relayed back from the viewer."""
+
+    def __init__(self, port: int = 0) -> None:
+        self.port = port
+        self.token = secrets.token_urlsafe(16)
+        self._targets: Dict[str, _ScreencastTarget] = {}
+        self._lock = threading.Condition()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._closed = False
+
+    # ---- page management (caller's thread) ----
+
+    def add_page(self, name: str, page: Page) -> None:
+        """Start screencasting ``page`` under ``name``."""
+        cdp = page.context.new_cdp_session(page)
+        target = _ScreencastTarget(page, cdp)
+
+        def on_frame(params: Dict[str, Any]) -> None:
+            with self._lock:
+                target.frame = base64.b64decode(params["data"])
+                target.frame_id += 1
+                target.pending_acks.append(params["sessionId"])
+                self._lock.notify_all()
+
+        cdp.on("Page.screencastFrame", on_frame)
+        viewport = page.viewport_size or {"width": 1280, "height": 800}
+        cdp.send("Page.startScreencast", {
+            "format": "jpeg",
+            "quality": JPEG_QUALITY,
+            "maxWidth": viewport["width"],
+            "maxHeight": viewport["height"],
+        })
+        with self._lock:
+            self._targets[name] = target
+
+    def remove_page(self, name: str) -> None:
+        """Stop screencasting ``name``; open viewers see the stream end."""
+        with self._lock:
+            target = self._targets.pop(name, None)
+            self._lock.notify_all()
+        if target is None:
+            return
+        try:
+            target.cdp.send("Page.stopScreencast")
+            target.cdp.detach()
+        except Exception:
+            pass  # Page or context already closed
+
+    def pump(self) -> None:
+        """Acknowledge received frames and replay queued input. Caller's thread only."""
+        with self._lock:
+            targets = list(self._targets.values())
+        for target in targets:
+            with self._lock:
+                acks, target.pending_acks = target.pending_acks, []
+            try:
+                for session_id in acks:
+                    target.cdp.send("Page.screencastFrameAck",
+                                    {"sessionId": session_id})
+                while True:
+                    try:
+                        event = target.inputs.get_nowait()
+                    except queue.Empty:
+                        break
+                    self._replay(target.page, event)
+            except Exception:
+                pass  # Page closed meanwhile; the caller notices on its next check
+
+    @staticmethod
+    def _replay(page: Page, event: Dict[str, Any]) -> None:
+        kind = event.get("type")
+        if kind == "click":
+            viewport = page.viewport_size or {"width": 1280, "height": 800}
+            page.mouse.click(float(event["x"]) * viewport["width"],
+                             float(event["y"]) * viewport["height"])
+        elif kind == "wheel":
+            page.mouse.wheel(float(event.get("dx", 0)), float(event.get("dy", 0)))
+        elif kind == "key" and event.get("key") in SPECIAL_KEYS:
+            page.keyboard.press(event["key"])
+        elif kind == "text" and event.get("text"):
+            page.keyboard.type(str(event["text"]))
+
+    # ---- HTTP server ----
+
+    def start(self) -> str:
+        """Start serving and return the viewer URL (includes the access token)."""
+        view = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:
+                pass  # Keep the CLI output clean
+
+            def _route(self) -> Optional[Tuple[str, str]]:
+                url = urlparse(self.path)
+                token = parse_qs(url.query).get("token", [""])[0]
+                if not secrets.compare_digest(token, view.token):
+                    self.send_error(403)
+                    return None
+                parts = url.path.strip("/").split("/", 1)
+                name = parts[1] if len(parts) > 1 else ""
+                return parts[0], unquote(name)
+
+            def do_GET(self) -> None:
+                route = self._route()
+                if route is None:
+                    return
+                kind, name = route
+                if kind == "":
+                    with view._lock:
+                        names = list(view._targets)
+                    body = VIEWER_HTML.replace(
+                        "__PAGES__", json.dumps(names)).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                elif kind == "stream":
+                    view._stream(self, name)
+                else:
+                    self.send_error(404)
+
+            def do_POST(self) -> None:
+                route = self._route()
+                if route is None:
+                    return
+                kind, name = route
+                with view._lock:
+                    target = view._targets.get(name)
+                if kind != "input" or target is None:
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    event = json.loads(self.rfile.read(length) or b"{}")
+                    target.inputs.put_nowait(event)
+                except (ValueError, queue.Full):
+                    self.send_error(400)
+                    return
+                self.send_response(204)
+                self.end_headers()
+
+        self._server = ThreadingHTTPServer((VIEW_HOST, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever,
+                         name="remote-view", daemon=True).start()
+        return f"http://{VIEW_HOST}:{self.port}/?token={self.token}"
+
+    def _stream(self, handler: BaseHTTPRequestHandler, name: str) -> None:
+        """Serve ``name`` as multipart MJPEG until the page goes away."""
+        handler.send_response(200)
+        handler.send_header("Cache-Control", "no-store")
+        handler.send_header(
+            "Content-Type", "multipart/x-mixed-replace; boundary=frame")
+        handler.end_headers()
+
+        last_id = -1
+        while True:
+            with self._lock:
+                while True:
+                    target = self._targets.get(name)
+                    if target is None or self._closed:
+                        return
+                    if target.frame is not None and target.frame_id != last_id:
+                        break
+                    self._lock.wait(1.0)
+                frame, last_id = target.frame, target.frame_id
+            try:
+                handler.wfile.write(
+                    b"--frame\r\nContent-Type: image/jpeg\r\n"
+                    + f"Content-Length: {len(frame)}\r\n\r\n".encode()
+                    + frame + b"\r\n")
+                handler.wfile.flush()
+            except OSError:
+                return  # Viewer disconnected
+
+    def close(self) -> None:
+        """Stop every screencast and the HTTP server."""
+        for name in list(self._targets):
+            self.remove_page(name)
+        with self._lock:
+            self._closed = True
+            self._lock.notify_all()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -14,11 +14,43 @@ Usage:
 
 from __future__ import annotations
 
+import json
 import os
 import platform
 import traceback
 from typing import Optional, Tuple, List
 from playwright.sync_api import sync_playwright, Playwright, BrowserContext, Error
+from valid_social_cli.utils.flight_recorder import (
+    attach_flight_recorder,
+    detach_flight_recorder,
+    flight_recorder_enabled,
+)
+from valid_social_cli.utils.asset_cache import (
+    asset_cache_enabled,
+    attach_asset_cache,
+    detach_asset_cache,
+)
+from valid_social_cli.utils.deadline import Deadline, DeadlineExceeded
+from valid_social_cli.utils.env_flags import env_flag
+from valid_social_cli.utils.profile_lease import (
+    ProfileLease,
+    ProfileLeaseTimeout,
+    acquire_profile_lease,
+    attach_profile_lease,
+    release_profile_lease,
+)
+from valid_social_cli.utils.har_harness import (
+    HAR_FILE_NAME,
+    HarSession,
+    attach_har_session,
+    finish_har_session,
+    latest_recording,
+    new_bundle_dir,
+    record_har_enabled,
+    replay_profile_dir,
+    resolve_replay_bundle,
+    stub_publish_requests,
+)
 
 # ---- STEALTH JS ----
 # Injected before any page loads. Covers common detection vectors.
@@ -75,9 +107,104 @@ if (window.chrome && window.chrome.runtime && !window.chrome.runtime.toString) {
 // 10) fix userAgent vendor/platform if needed (done server-side via Playwright context)
 """
 
+# Chrome major version claimed by the user agents, the client-hint header and
+# navigator.userAgentData.brands. All three must agree.
+CHROME_MAJOR_VERSION = "118"
+CLIENT_HINT_BRANDS = [
+    {"brand": "Chromium", "version": CHROME_MAJOR_VERSION},
+    {"brand": "Google Chrome", "version": CHROME_MAJOR_VERSION},
+    {"brand": "Not=A?Brand", "version": "99"},
+]
+
+# WebGL vendor/renderer reported headless, matching the default user agent's
+# OS: Chrome on Windows and Linux reports its GPU through ANGLE.
+WEBGL_IDENTITIES = {
+    "Darwin": ("Intel Inc.", "Intel Iris OpenGL Engine"),
+    "Linux": ("Google Inc. (Intel)",
+              "ANGLE (Intel, Mesa Intel(R) UHD Graphics 620 (KBL GT2), OpenGL 4.6)"),
+    "Windows": ("Google Inc. (Intel)",
+                "ANGLE (Intel, Intel(R) UHD Graphics 620 Direct3D11 vs_5_0 ps_5_0, D3D11)"),
+}
+
+# Extra patches for headless Chromium, which differs from headed Chrome in
+# ways the script above does not cover: "HeadlessChrome" client-hint brands,
+# zero-sized outer window, SwiftShader WebGL, denied notifications, no
+# mimeTypes and an empty network information object.
+HEADLESS_STEALTH_INIT_SCRIPT: str = r"""
+// 1) userAgentData brands matching the user agent, without "HeadlessChrome"
+if (navigator.userAgentData) {
+  const _brands = __BRANDS__;
+  Object.defineProperty(navigator.userAgentData, 'brands', { get: () => _brands });
+}
+
+// 2) outer window size is 0x0 headless; make it look like a real window
+if (!window.outerWidth || !window.outerHeight) {
+  Object.defineProperty(window, 'outerWidth', { get: () => window.innerWidth });
+  Object.defineProperty(window, 'outerHeight', { get: () => window.innerHeight + 85 });
+}
+Object.defineProperty(screen, 'availHeight', { get: () => screen.height - 40 });
+
+// 3) WebGL vendor/renderer (SwiftShader gives headless away)
+const _patchWebGL = (proto) => {
+  if (!proto) return;
+  const _getParameter = proto.getParameter;
+  proto.getParameter = function (param) {
+    if (param === 37445) return __WEBGL_VENDOR__;   // UNMASKED_VENDOR_WEBGL
+    if (param === 37446) return __WEBGL_RENDERER__; // UNMASKED_RENDERER_WEBGL
+    return _getParameter.call(this, param);
+  };
+};
+_patchWebGL(window.WebGLRenderingContext && WebGLRenderingContext.prototype);
+_patchWebGL(window.WebGL2RenderingContext && WebGL2RenderingContext.prototype);
+
+// 4) Notification.permission is "denied" headless, "default" in a fresh profile
+if (window.Notification && Notification.permission === 'denied') {
+  Object.defineProperty(Notification, 'permission', { get: () => 'default' });
+}
+
+// 5) mimeTypes are empty headless
+if (!navigator.mimeTypes || navigator.mimeTypes.length === 0) {
+  Object.defineProperty(navigator, 'mimeTypes', {
+    get: () => [{ type: 'application/pdf', suffixes: 'pdf' }],
+  });
+}
+
+// 6) network information reports rtt 0 headless
+if (navigator.connection && navigator.connection.rtt === 0) {
+  Object.defineProperty(navigator.connection, 'rtt', { get: () => 50 });
+}
+""".replace("__BRANDS__", json.dumps(CLIENT_HINT_BRANDS))
+
+# Client hints sent with every request; headless Chromium would announce
+# itself as "HeadlessChrome".
+HEADLESS_CLIENT_HINTS = {
+    "sec-ch-ua": ", ".join(f'"{b["brand"]}";v="{b["version"]}"' for b in CLIENT_HINT_BRANDS),
+}
+
+HEADLESS_ENV = "VALID_SOCIAL_HEADLESS"
+
 # ---- Helper utilities ----
 
 
+def headless_enabled(flag: Optional[bool] = None) -> bool:
+    """
+    Resolve whether browsers should run headless.
+
+    An explicit flag wins; otherwise the VALID_SOCIAL_HEADLESS environment
+    variable is consulted ("0", "false", "no" or "off" for a visible window).
+    Headless is the default.
+    """
+    return env_flag(HEADLESS_ENV, flag, default=True)
+
+
+def headless_stealth_script(system: str) -> str:
+    """HEADLESS_STEALTH_INIT_SCRIPT with a WebGL identity matching ``system``."""
+    vendor, renderer = WEBGL_IDENTITIES.get(system, WEBGL_IDENTITIES["Windows"])
+    return (HEADLESS_STEALTH_INIT_SCRIPT
+            .replace("__WEBGL_VENDOR__", json.dumps(vendor))
+            .replace("__WEBGL_RENDERER__", json.dumps(renderer)))
+
+
 def ensure_profile_dir(path: str) -> str:
     """
     Ensure the provided path exists and return its absolute path.
@@ -103,13 +230,45 @@ def default_user_data_dir(prefix: str = "chromium") -> str:
 
 def launch_stealth_browser(
     user_data_dir: Optional[str] = None,
-    headless: bool = False,
+    headless: Optional[bool] = None,
     slow_mo: int = 60,
     user_agent: Optional[str] = None,
+    flight_recorder: Optional[bool] = None,
+    playwright: Optional[Playwright] = None,
+    asset_cache: Optional[bool] = None,
+    timeout: Optional[float] = None,
+    deadline: Optional[Deadline] = None,
+    record_har: Optional[bool] = None,
+    replay_har: Optional[str] = None,
 ) -> Tuple[Playwright, BrowserContext]:
     """
     Launch Playwright bundled Chromium with stealth patches and a persistent context.
 
+    Set ``flight_recorder`` (or VALID_SOCIAL_FLIGHT_RECORDER=1) to attach a
+    flight recorder that dumps a trace, screenshot and HAR when a step fails.
+
+    Pass an already started ``playwright`` to open several profiles from one
+    driver; it is then left running if the launch fails.
+
+    Set ``asset_cache`` (or VALID_SOCIAL_ASSET_CACHE=1) to serve immutable
+    JS/CSS bundles from the content-addressed store shared by all profiles.
+
+    ``timeout`` (milliseconds) bounds the Chromium launch itself.
+
+    The profile is leased for as long as the context is open, so concurrent
+    runs using the same profile wait their turn; see profile_lease. With a
+    ``deadline`` the wait may use the attempt's whole remaining budget and
+    raises DeadlineExceeded when it runs out; the launch then gets the
+    deadline's launch share as its ``timeout``.
+
+    ``headless`` defaults to VALID_SOCIAL_HEADLESS (headless unless set to
+    0); headless launches get extra stealth patches and client hints.
+
+    Set ``record_har`` (or VALID_SOCIAL_RECORD_HAR=1) to record the session
+    to a scrubbed HAR bundle, or pass ``replay_har`` ("latest" or a bundle
+    path) to replay a recording offline in a throwaway profile with the
+    publish requests stubbed; see har_harness.
+
     Returns:
         (playwright, context)
     """
@@ -118,8 +277,60 @@ def launch_stealth_browser(
 
     # Sanitize and ensure profile dir
     user_data_dir = ensure_profile_dir(user_data_dir)
+    label = os.path.basename(user_data_dir)
+
+    # HAR record/replay; a replay runs in a throwaway profile
+    har_session: Optional[HarSession] = None
+    if replay_har:
+        baseline = resolve_replay_bundle(replay_har, label)
+        user_data_dir = replay_profile_dir(label)
+        asset_cache = False  # Everything must come from the recording
+        har_session = HarSession(
+            label, new_bundle_dir(label, "replay-"), "replay",
+            baseline_dir=baseline,
+            har_path=os.path.join(baseline, HAR_FILE_NAME),
+            temp_profile=user_data_dir,
+        )
+        print(f"🧪 Replaying {label} offline from {baseline}")
+    elif record_har_enabled(record_har):
+        previous = latest_recording(label)
+        bundle = new_bundle_dir(label)
+        har_session = HarSession(
+            label, bundle, "record",
+            baseline_dir=previous,
+            har_path=os.path.join(bundle, HAR_FILE_NAME),
+        )
 
-    playwright: Playwright = sync_playwright().start()
+    # Wait for exclusive use of the profile, for as long as the budget allows
+    lease: Optional[ProfileLease] = None
+    try:
+        if not replay_har:
+            try:
+                lease = acquire_profile_lease(
+                    user_data_dir, None if deadline is None else deadline.remaining())
+            except ProfileLeaseTimeout as exc:
+                raise DeadlineExceeded(
+                    f"deadline exceeded waiting for the profile: {exc}") from exc
+        if timeout is None and deadline is not None:
+            timeout = deadline.timeout_ms("launch")
+    except BaseException:
+        if lease is not None:
+            lease.release()
+        if har_session is not None:
+            har_session.discard()
+        raise
+
+    headless = headless_enabled(headless)
+    owns_playwright = playwright is None
+    if playwright is None:
+        try:
+            playwright = sync_playwright().start()
+        except BaseException:
+            if lease is not None:
+                lease.release()
+            if har_session is not None:
+                har_session.discard()
+            raise
 
     system = platform.system()
 
@@ -127,13 +338,16 @@ def launch_stealth_browser(
     if user_agent is None:
         if system == "Darwin":
             user_agent = ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                          "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36")
+                          "AppleWebKit/537.36 (KHTML, like Gecko) "
+                          f"Chrome/{CHROME_MAJOR_VERSION}.0.0.0 Safari/537.36")
         elif system == "Linux":
             user_agent = ("Mozilla/5.0 (X11; Linux x86_64) "
-                          "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36")
+                          "AppleWebKit/537.36 (KHTML, like Gecko) "
+                          f"Chrome/{CHROME_MAJOR_VERSION}.0.0.0 Safari/537.36")
         else:  # Windows and others
             user_agent = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                          "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36")
+                          "AppleWebKit/537.36 (KHTML, like Gecko) "
+                          f"Chrome/{CHROME_MAJOR_VERSION}.0.0.0 Safari/537.36")
 
     # Construct safe args. Keep them conservative for Windows.
     args: List[str] = [
@@ -148,17 +362,36 @@ def launch_stealth_browser(
     if system == "Linux":
         args += ["--no-sandbox", "--disable-dev-shm-usage"]
 
+    # Headless has no real window; give it the same size as the viewport
+    if headless:
+        args.append("--window-size=1280,800")
+
+    recording = har_session is not None and har_session.mode == "record"
+    context: Optional[BrowserContext] = None
     try:
         # Always use Playwright's bundled Chromium (no executable_path)
-        context: BrowserContext = playwright.chromium.launch_persistent_context(
+        context = playwright.chromium.launch_persistent_context(
             user_data_dir=user_data_dir,
             headless=headless,
             slow_mo=slow_mo,
             args=args,
             viewport={"width": 1280, "height": 800},
             user_agent=user_agent,
+            extra_http_headers=HEADLESS_CLIENT_HINTS if headless else None,
+            timeout=timeout,
+            record_har_path=har_session.har_path if recording else None,
+            record_har_content="attach" if recording else None,
         )
 
+        if lease is not None:
+            attach_profile_lease(context, lease)
+        if har_session is not None:
+            attach_har_session(context, har_session)
+            if har_session.mode == "replay":
+                # Later routes win: publish stubs take precedence over the HAR
+                context.route_from_har(har_session.har_path, not_found="abort")
+                stub_publish_requests(context, label, har_session.har_path)
+
         # close default blank pages if any
         for p in list(context.pages):
             try:
@@ -168,25 +401,75 @@ def launch_stealth_browser(
 
         # inject stealth before any navigations
         context.add_init_script(STEALTH_INIT_SCRIPT)
+        if headless:
+            context.add_init_script(headless_stealth_script(system))
+
+        if asset_cache_enabled(asset_cache):
+            attach_asset_cache(context, label=label)
+
+        if flight_recorder_enabled(flight_recorder):
+            attach_flight_recorder(context, label=label)
 
         # Final debug print
+        mode = "headless" if headless else "headed"
         print(
-            f"✅ Launched Playwright bundled Chromium. user_data_dir={user_data_dir}")
+            f"✅ Launched Playwright bundled Chromium ({mode}). user_data_dir={user_data_dir}")
         return playwright, context
 
     except Exception as exc:
         # Ensure Playwright is stopped and bubble up after diagnostic
         print("❌ Failed launching Playwright bundled Chromium. Traceback follows:")
         traceback.print_exc()
-        try:
-            playwright.stop()
-        except Exception:
-            pass
+        if context is not None:
+            close_context(context, False)
+        elif har_session is not None:
+            har_session.discard()
+        if lease is not None:
+            lease.release()
+        if owns_playwright:
+            try:
+                playwright.stop()
+            except Exception:
+                pass
         raise exc
 
 # ---- Session helpers ----
 
 
+def close_context(
+    context: BrowserContext,
+    show_errors: bool = True
+) -> None:
+    """
+    Safely close a single browser context, leaving Playwright running.
+    Can be called multiple times without raising errors.
+    """
+    detach_flight_recorder(context)
+    detach_asset_cache(context, show_errors)
+    try:
+        context.close()
+        if show_errors:
+            print("✅ Browser context closed successfully.")
+    except Error as e:
+        # Ignore "Event loop is closed" errors
+        if "Event loop is closed" in str(e):
+            if show_errors:
+                print("ℹ️ Browser context already closed (event loop closed).")
+        else:
+            if show_errors:
+                print("⚠️ Error when closing browser context:")
+                traceback.print_exc()
+    except Exception:
+        if show_errors:
+            print("⚠️ Unexpected error when closing browser context:")
+            traceback.print_exc()
+    finally:
+        # Chromium has let go of the profile; hand it to the next waiter
+        release_profile_lease(context)
+        # The HAR file is only complete once the context has closed
+        finish_har_session(context)
+
+
 def close_playwright(
     playwright: Playwright,
     context: Optional[BrowserContext],
@@ -198,23 +481,7 @@ def close_playwright(
     """
     # Close the browser context
     if context is not None:
-        try:
-            context.close()
-            if show_errors:
-                print("✅ Browser context closed successfully.")
-        except Error as e:
-            # Ignore "Event loop is closed" errors
-            if "Event loop is closed" in str(e):
-                if show_errors:
-                    print("ℹ️ Browser context already closed (event loop closed).")
-            else:
-                if show_errors:
-                    print("⚠️ Error when closing browser context:")
-                    traceback.print_exc()
-        except Exception:
-            if show_errors:
-                print("⚠️ Unexpected error when closing browser context:")
-                traceback.print_exc()
+        close_context(context, show_errors)
 
     # Stop Playwright
     try:
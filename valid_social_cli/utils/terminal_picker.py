@@ -0,0 +1,129 @@
+import os
+import time
+from typing import List, Optional
+from valid_social_cli.utils.media_index import MediaIndex, default_media_roots
+
+RESULT_LIMIT = 20
+
+
+def _parse_numbers(text: str, count: int) -> Optional[List[int]]:
+    """Parse '1,3' or '2-5' into zero-based indices, or None if invalid."""
+    indices: List[int] = []
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, _, end = part.partition("-")
+            if not (start.isdigit() and end.isdigit()):
+                return None
+            indices.extend(range(int(start) - 1, int(end)))
+        elif part.isdigit():
+            indices.append(int(part) - 1)
+        else:
+            return None
+    if not indices or any(i < 0 or i >= count for i in indices):
+        return None
+    return indices
+
+
+def pick_media(roots: Optional[List[str]] = None) -> Optional[List[str]]:
+    """
+    Terminal media picker with fuzzy search over the on-disk media index.
+
+    Works over SSH and on headless servers. The index is refreshed
+    incrementally on start, so only directories that changed since the
+    last run are re-listed.
+
+    Args:
+        roots (list[str] | None): Media directories to search. Defaults to
+            VALID_SOCIAL_MEDIA_DIRS or the current working directory.
+
+    Returns:
+        list[str] | None: The selected file paths, or None if cancelled.
+    """
+    roots = roots or default_media_roots()
+    index = MediaIndex()
+
+    started = time.monotonic()
+    scanned, reused = index.refresh(roots)
+    print(
+        f"🗂️ Media index ready in {time.monotonic() - started:.1f}s "
+        f"({scanned} folder(s) rescanned, {reused} unchanged).")
+
+    results: List[str] = []
+    selected: List[str] = []
+
+    print("\n🔎 Search your media library (fuzzy, or a glob like *.mp4).")
+    print("Commands:")
+    print("  <text>   → Search file names and folders")
+    print("  1,3 / 2-4 → Select results by number")
+    print("  ADD path → Add a file by path")
+    print("  SHOW     → Show selected files")
+    print("  DEL n    → Remove selected file number n")
+    print("  CLEAR    → Clear the selection")
+    print("  GUI      → Open the system file picker instead")
+    print("  DONE     → Finish selection")
+    print("  QUIT     → Cancel media selection\n")
+
+    while True:
+        user_input = input("🔎 ").strip()
+        command = user_input.upper()
+
+        if not user_input:
+            continue
+        elif command == "DONE":
+            return selected or None
+        elif command == "QUIT":
+            return None
+        elif command == "SHOW":
+            if not selected:
+                print("(Nothing selected yet)")
+            for i, path in enumerate(selected, start=1):
+                print(f"{i}: {path}")
+        elif command == "CLEAR":
+            selected.clear()
+            print("Selection cleared.")
+        elif command == "GUI":
+            from valid_social_cli.utils.file_selector import select_file
+            try:
+                picked = select_file(
+                    title="Select media for upload", multiple=True)
+            except Exception:
+                print("❌ System file picker is not available here.")
+                continue
+            if isinstance(picked, str):
+                picked = [picked]
+            for path in picked or []:
+                if path not in selected:
+                    selected.append(path)
+            print(f"✅ {len(selected)} file(s) selected.")
+        elif command.startswith("ADD "):
+            path = os.path.abspath(os.path.expanduser(user_input[4:].strip()))
+            if os.path.isfile(path):
+                if path not in selected:
+                    selected.append(path)
+                print(f"✅ Added {path}")
+            else:
+                print("❌ File not found.")
+        elif command.startswith("DEL "):
+            try:
+                idx = int(user_input.split()[1]) - 1
+                if 0 <= idx < len(selected):
+                    print(f"Removed {selected.pop(idx)}")
+                else:
+                    print("❌ Invalid number.")
+            except Exception:
+                print("❌ Invalid command format. Use DEL n")
+        elif results and _parse_numbers(user_input, len(results)) is not None:
+            for i in _parse_numbers(user_input, len(results)) or []:
+                if results[i] not in selected:
+                    selected.append(results[i])
+            print(f"✅ {len(selected)} file(s) selected. Type DONE to finish.")
+        else:
+            results = index.search(user_input, roots, limit=RESULT_LIMIT)
+            if not results:
+                print("No matches.")
+                continue
+            for i, path in enumerate(results, start=1):
+                marker = "✓" if path in selected else " "
+                print(f" {marker} {i}. {path}")
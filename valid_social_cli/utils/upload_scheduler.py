@@ -0,0 +1,294 @@
+"""
+Bandwidth-aware admission for media uploads across concurrent runs.
+
+When several ``valid-social`` processes upload video at the same time they
+all share one uplink, so every upload slows down and some hit the platforms'
+own timeouts. Before handing media to the browser, a run asks for an upload
+slot. The scheduler's state is kept in ``storage/upload_scheduler/state.json``,
+which is only changed while holding an OS file lock, and is shared by every
+process on the machine.
+
+Admission:
+    * Waiting uploads are considered smallest first, so an image post is not
+      stuck behind a 2 GB video. Uploads that have waited longer than
+      ``AGING_SECONDS`` move to the front. An aged upload that does not fit
+      yet blocks everything behind it, so the uploads in flight drain and it
+      starts once nothing else is running: big files cannot starve.
+    * An upload starts if the bytes already in flight plus its own stay
+      under the limit, and its host has fewer than ``PER_HOST_CONCURRENCY``
+      uploads running. An upload is always admitted when nothing is in
+      flight, however large it is.
+    * Achieved throughput is kept as an EWMA, and the limit is set to what
+      the uplink moves in ``TARGET_SECONDS``.
+
+Throughput is measured separately from the slot. An UploadMeter watches the
+context for large POST/PUT requests that finish after the media is handed to
+the browser. Only that transfer window is timed, not the human-like pauses
+or the typing around it.
+
+Entries of processes that died are dropped whenever the state is read.
+
+Usage:
+    ticket = acquire_upload_slot("x.com", total_bytes, deadline)
+    meter = UploadMeter(context)
+    try:
+        ...  # upload and publish
+        sample = meter.stop()
+        if sample is not None:
+            record_throughput(*sample)
+    finally:
+        meter.stop()
+        ticket.release()
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from playwright.sync_api import BrowserContext, Request
+from valid_social_cli.utils.deadline import Deadline
+from valid_social_cli.utils.profile_lease import pid_alive, try_lock_file, unlock_file
+
+SCHEDULER_DIR = os.path.join("storage", "upload_scheduler")
+STATE_PATH = os.path.join(SCHEDULER_DIR, "state.json")
+LOCK_PATH = os.path.join(SCHEDULER_DIR, "state.lock")
+
+PER_HOST_CONCURRENCY = 2
+DEFAULT_LIMIT_BYTES = 200 * 1024 * 1024
+MIN_LIMIT_BYTES = 25 * 1024 * 1024
+MAX_LIMIT_BYTES = 2 * 1024 * 1024 * 1024
+# In-flight bytes are capped at what the uplink moves in this many seconds.
+TARGET_SECONDS = 60.0
+EWMA_ALPHA = 0.3
+AGING_SECONDS = 120.0
+# An active entry older than this is assumed abandoned.
+MAX_ACTIVE_SECONDS = 3 * 3600
+POLL_INTERVAL = 0.5
+# Requests with a smaller body are not media uploads.
+MIN_UPLOAD_REQUEST_BYTES = 16 * 1024
+REPORT_WAIT_SECONDS = 1.0
+
+
+@contextmanager
+def _locked_state() -> Iterator[Dict[str, Any]]:
+    """Load the shared state under the file lock and save it on exit."""
+    os.makedirs(SCHEDULER_DIR, exist_ok=True)
+    fd = os.open(LOCK_PATH, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        while not try_lock_file(fd):
+            time.sleep(0.01)
+        try:
+            with open(STATE_PATH, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        state.setdefault("uploads", {})
+        state.setdefault("limit_bytes", DEFAULT_LIMIT_BYTES)
+        state.setdefault("throughput", None)
+        _prune(state["uploads"])
+
+        yield state
+
+        tmp_path = STATE_PATH + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, STATE_PATH)
+    finally:
+        unlock_file(fd)
+        os.close(fd)
+
+
+def _prune(uploads: Dict[str, Dict[str, Any]]) -> None:
+    now = time.time()
+    for ticket_id, entry in list(uploads.items()):
+        if not pid_alive(entry["pid"]):
+            del uploads[ticket_id]
+        elif entry["state"] == "active" and now - entry["started_at"] > MAX_ACTIVE_SECONDS:
+            del uploads[ticket_id]
+
+
+def _admitted(state: Dict[str, Any], now: float) -> List[str]:
+    """Waiting tickets that may start now, in admission order."""
+    uploads = state["uploads"]
+    active = [e for e in uploads.values() if e["state"] == "active"]
+    in_flight = sum(e["bytes"] for e in active)
+    per_host: Dict[str, int] = {}
+    for entry in active:
+        per_host[entry["host"]] = per_host.get(entry["host"], 0) + 1
+
+    waiting = [(tid, e) for tid, e in uploads.items() if e["state"] == "waiting"]
+    waiting.sort(key=lambda item: (
+        now - item[1]["queued_at"] < AGING_SECONDS,  # aged uploads first
+        item[1]["bytes"],
+        item[1]["queued_at"],
+    ))
+
+    admitted: List[str] = []
+    held_hosts: Set[str] = set()
+    for ticket_id, entry in waiting:
+        aged = now - entry["queued_at"] >= AGING_SECONDS
+        if entry["host"] in held_hosts:
+            continue
+        if per_host.get(entry["host"], 0) >= PER_HOST_CONCURRENCY:
+            if aged:
+                held_hosts.add(entry["host"])  # Reserve its host's next free slot
+            continue
+        if in_flight and in_flight + entry["bytes"] > state["limit_bytes"]:
+            if aged:
+                break  # Let in-flight uploads drain so it can start
+            continue
+        admitted.append(ticket_id)
+        in_flight += entry["bytes"]
+        per_host[entry["host"]] = per_host.get(entry["host"], 0) + 1
+    return admitted
+
+
+def _format_mb(num_bytes: float) -> str:
+    return f"{num_bytes / (1024 * 1024):.0f} MB"
+
+
+class UploadTicket:
+    """An admitted upload. Release it once the post is done or abandoned."""
+
+    def __init__(self, ticket_id: str, host: str, num_bytes: int) -> None:
+        self.ticket_id = ticket_id
+        self.host = host
+        self.bytes = num_bytes
+        self.done = False
+
+    def release(self) -> None:
+        """Free the slot. Safe to call twice."""
+        if self.done:
+            return
+        self.done = True
+        with _locked_state() as state:
+            state["uploads"].pop(self.ticket_id, None)
+
+
+class UploadMeter:
+    """
+    Times the media transfer of one upload from the browser's own requests.
+
+    Start it right before the files are handed to the browser. Every POST or
+    PUT that finishes afterwards with a body of at least
+    ``MIN_UPLOAD_REQUEST_BYTES`` counts as upload traffic. The window ends
+    when the last of those requests finishes.
+    """
+
+    def __init__(self, context: BrowserContext) -> None:
+        self.context = context
+        self.started = time.monotonic()
+        self._finished: List[Tuple[Request, float]] = []
+        self._stopped = False
+        context.on("requestfinished", self._on_request_finished)
+
+    def _on_request_finished(self, request: Request) -> None:
+        if request.method in ("POST", "PUT"):
+            self._finished.append((request, time.monotonic()))
+
+    def stop(self) -> Optional[Tuple[int, float]]:
+        """
+        Stop listening and return ``(bytes, seconds)`` of the transfer window,
+        or None if no upload traffic was seen. Safe to call twice.
+        """
+        if self._stopped:
+            return None
+        self._stopped = True
+        try:
+            self.context.remove_listener("requestfinished", self._on_request_finished)
+        except Exception:
+            pass  # Context already closed
+
+        total = 0
+        last_end: Optional[float] = None
+        for request, finished_at in self._finished:
+            try:
+                size = request.sizes()["requestBodySize"]
+            except Exception:
+                continue
+            if size >= MIN_UPLOAD_REQUEST_BYTES:
+                total += size
+                last_end = finished_at
+        if last_end is None:
+            return None
+        return total, max(last_end - self.started, 0.001)
+
+
+def record_throughput(num_bytes: int, seconds: float) -> None:
+    """Fold a measured transfer into the shared EWMA and adjust the limit."""
+    sample = num_bytes / max(seconds, 0.001)
+    with _locked_state() as state:
+        previous = state["throughput"]
+        throughput = sample if previous is None else (
+            EWMA_ALPHA * sample + (1 - EWMA_ALPHA) * previous)
+        state["throughput"] = throughput
+        state["limit_bytes"] = min(MAX_LIMIT_BYTES, max(
+            MIN_LIMIT_BYTES, int(throughput * TARGET_SECONDS)))
+
+
+def acquire_upload_slot(
+    host: str,
+    num_bytes: int,
+    deadline: Optional[Deadline] = None,
+) -> UploadTicket:
+    """
+    Queue an upload of ``num_bytes`` to ``host`` and wait until it may start.
+
+    Args:
+        host: Upload destination, used for the per-host concurrency limit.
+        num_bytes: Total size of the media being uploaded.
+        deadline: Optional budget; DeadlineExceeded is raised if it runs out
+            while waiting.
+
+    Returns:
+        The admitted UploadTicket.
+    """
+    deadline = deadline or Deadline()
+    ticket_id = uuid.uuid4().hex
+    started = time.monotonic()
+    with _locked_state() as state:
+        state["uploads"][ticket_id] = {
+            "pid": os.getpid(),
+            "host": host,
+            "bytes": num_bytes,
+            "state": "waiting",
+            "queued_at": time.time(),
+        }
+
+    reported = False
+    try:
+        while True:
+            with _locked_state() as state:
+                entry = state["uploads"].get(ticket_id)
+                if entry is None:
+                    # Pruned (e.g. the clock jumped); queue again.
+                    entry = state["uploads"][ticket_id] = {
+                        "pid": os.getpid(), "host": host, "bytes": num_bytes,
+                        "state": "waiting", "queued_at": time.time(),
+                    }
+                if ticket_id in _admitted(state, time.time()):
+                    entry["state"] = "active"
+                    entry["started_at"] = time.time()
+                    break
+                in_flight = sum(e["bytes"] for e in state["uploads"].values()
+                                if e["state"] == "active")
+                limit = state["limit_bytes"]
+
+            if not reported and time.monotonic() - started >= REPORT_WAIT_SECONDS:
+                reported = True
+                print(f"⏳ Waiting for upload bandwidth: {_format_mb(in_flight)} in flight, "
+                      f"limit {_format_mb(limit)}...")
+            deadline.sleep(POLL_INTERVAL)
+    except BaseException:
+        with _locked_state() as state:
+            state["uploads"].pop(ticket_id, None)
+        raise
+
+    waited = time.monotonic() - started
+    if waited >= REPORT_WAIT_SECONDS:
+        print(f"🚦 Upload slot granted after {waited:.1f}s.")
+    return UploadTicket(ticket_id, host, num_bytes)